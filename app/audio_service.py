@@ -18,7 +18,9 @@ from mutagen.mp3 import MP3, EasyMP3
 from mutagen.mp4 import MP4, MP4Cover
 
 import re
+from urllib.parse import urlparse
 from app.cache import is_cached, get_cached_file, cache_file, get_cache_path
+from app.http_client import PooledClientMixin
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +29,25 @@ BITRATE = os.environ.get("MP3_BITRATE", "320k")
 DEEZER_API_URL = os.environ.get("DEEZER_API_URL", "https://api.deezmate.com")
 USER_AGENT = "Freedify/1.0 (Cross-Platform; Python) httpx/0.27"
 
+# Direct audio file extensions (no yt-dlp needed) -> MIME type
+AUDIO_EXT_TO_MIME = {
+    "mp3": "audio/mpeg",
+    "m4a": "audio/mp4",
+    "ogg": "audio/ogg",
+    "wav": "audio/wav",
+    "aac": "audio/aac",
+    "opus": "audio/opus",
+    "flac": "audio/flac",
+}
+
+
+def direct_audio_mime(url: str) -> Optional[str]:
+    """MIME type if the URL path points straight at an audio file, else None."""
+    path = urlparse(url).path
+    if "." not in path:
+        return None
+    return AUDIO_EXT_TO_MIME.get(path.rsplit(".", 1)[1].lower())
+
 # FFmpeg path - check common locations on Windows
 FFMPEG_PATH = os.environ.get("FFMPEG_PATH", "ffmpeg")
 if os.name == 'nt' and FFMPEG_PATH == "ffmpeg":
@@ -54,12 +75,15 @@ TIDAL_APIS = [
 
 
 
-class AudioService:
+class AudioService(PooledClientMixin):
     """Service for fetching and transcoding audio."""
     
     # Tidal credentials (same as SpotiFLAC)
     TIDAL_CLIENT_ID = base64.b64decode("NkJEU1JkcEs5aHFFQlRnVQ==").decode()
     TIDAL_CLIENT_SECRET = base64.b64decode("eGV1UG1ZN25icFo5SUliTEFjUTkzc2hrYTFWTmhlVUFxTjZJY3N6alRHOD0=").decode()
+    # Long reads for audio payloads, but fail fast on unreachable mirrors
+    TIMEOUT = httpx.Timeout(60.0, connect=5.0)
+    HEADERS = {"User-Agent": USER_AGENT}
 
     async def import_url(self, url: str) -> Optional[Dict[str, Any]]:
         """Import track or playlist from URL using yt-dlp."""
@@ -238,11 +262,7 @@ class AudioService:
         For direct audio files (.mp3, .m4a, etc.), return as-is.
         """
         # Check if URL is already a direct audio file
-        from urllib.parse import urlparse
-        parsed = urlparse(url)
-        path_lower = parsed.path.lower()
-        audio_extensions = ('.mp3', '.m4a', '.ogg', '.wav', '.aac', '.flac', '.opus')
-        if any(path_lower.endswith(ext) for ext in audio_extensions):
+        if direct_audio_mime(url):
             logger.info(f"Direct audio URL detected, bypassing yt-dlp: {url[:60]}...")
             return url
         
@@ -277,26 +297,29 @@ class AudioService:
     # Simple in-memory cache for resolved stream URLs (to speed up seeking)
     _stream_url_cache = {}  # {url: (stream_url, expire_time)}
     
-    def __init__(self):
-        # Enable redirect following and increase timeout
-        # Using a shared client with a connection pool to avoid socket exhaustion
-        limits = httpx.Limits(max_keepalive_connections=50, max_connections=100)
-        self.client = httpx.AsyncClient(
-            timeout=60.0, 
-            follow_redirects=True, 
-            limits=limits,
-            headers={"User-Agent": USER_AGENT}
-        )
+    def __init__(self, client: Optional[httpx.AsyncClient] = None, owns_client: bool = False):
+        # Shared pooled client (follows redirects); User-Agent and timeout travel per-request
+        self._bind_client(client, owns_client)
         
         self.tidal_token: Optional[str] = None
         self.working_api: Optional[str] = None  # Cache the last working API
     
+    async def _get(self, url: str, headers: Optional[Dict[str, str]] = None, **kwargs) -> httpx.Response:
+        """GET on the shared client with this service's User-Agent and timeout."""
+        kwargs.setdefault("timeout", self.TIMEOUT)
+        return await self.client.get(url, headers={**self.HEADERS, **(headers or {})}, **kwargs)
+    
+    async def _post(self, url: str, headers: Optional[Dict[str, str]] = None, **kwargs) -> httpx.Response:
+        """POST on the shared client with this service's User-Agent and timeout."""
+        kwargs.setdefault("timeout", self.TIMEOUT)
+        return await self.client.post(url, headers={**self.HEADERS, **(headers or {})}, **kwargs)
+    
     async def get_tidal_token(self) -> str:
         """Get Tidal access token."""
         if self.tidal_token:
             return self.tidal_token
         
-        response = await self.client.post(
+        response = await self._post(
             "https://auth.tidal.com/v1/oauth2/token",
             data={
                 "client_id": self.TIDAL_CLIENT_ID,
@@ -314,7 +337,7 @@ class AudioService:
             token = await self.get_tidal_token()
             search_query = query or isrc
             
-            response = await self.client.get(
+            response = await self._get(
                 "https://api.tidal.com/v1/search/tracks",
                 headers={"Authorization": f"Bearer {token}"},
                 params={
@@ -350,7 +373,7 @@ class AudioService:
             full_url = f"{api_url}/track/?id={track_id}&quality={quality}"
             logger.info(f"Trying API: {api_url}")
             
-            response = await self.client.get(full_url, timeout=30.0)
+            response = await self._get(full_url, timeout=30.0)
             
             if response.status_code != 200:
                 logger.warning(f"API {api_url} returned {response.status_code}")
@@ -581,7 +604,7 @@ class AudioService:
         """Fetch Tidal album art."""
         try:
             url = f"https://resources.tidal.com/images/{cover_uuid.replace('-', '/')}/1280x1280.jpg"
-            response = await self.client.get(url)
+            response = await self._get(url)
             if response.status_code == 200:
                 return response.content
         except Exception:
@@ -591,7 +614,7 @@ class AudioService:
     async def get_deezer_track_info(self, isrc: str) -> Optional[Dict]:
         """Get Deezer track info from ISRC."""
         try:
-            response = await self.client.get(
+            response = await self._get(
                 f"https://api.deezer.com/2.0/track/isrc:{isrc}"
             )
             if response.status_code == 200:
@@ -606,7 +629,7 @@ class AudioService:
     async def get_deezer_download_url(self, track_id: int) -> Optional[str]:
         """Get FLAC download URL from Deezer API."""
         try:
-            response = await self.client.get(
+            response = await self._get(
                 f"{DEEZER_API_URL}/dl/{track_id}",
                 timeout=30.0
             )
@@ -659,12 +682,12 @@ class AudioService:
         
         # Handle Deezer track IDs (dz_XXXXX format) - extract ISRC first
         if isrc.startswith("dz_"):
-            deezer_track_id = isrc.replace("dz_", "")
+            deezer_track_id = isrc.removeprefix("dz_")
             logger.info(f"Deezer track ID detected: {deezer_track_id}")
             
             try:
                 # Fetch track info from Deezer public API to get ISRC
-                response = await self.client.get(
+                response = await self._get(
                     f"https://api.deezer.com/track/{deezer_track_id}"
                 )
                 if response.status_code == 200:
@@ -743,7 +766,7 @@ class AudioService:
                         # Download album art if URL is present
                         if metadata.get("album_art_url"):
                             try:
-                                art_resp = await self.client.get(metadata["album_art_url"])
+                                art_resp = await self._get(metadata["album_art_url"])
                                 if art_resp.status_code == 200:
                                     metadata["album_art_data"] = art_resp.content
                                     logger.info("Downloaded album art from Dab/Qobuz")
@@ -802,9 +825,9 @@ class AudioService:
         
         # If we have cached deezer_info from above, use it; otherwise fetch
         if not deezer_info and isrc.startswith("dz_"):
-            deezer_track_id = isrc.replace("dz_", "")
+            deezer_track_id = isrc.removeprefix("dz_")
             try:
-                response = await self.client.get(f"https://api.deezer.com/track/{deezer_track_id}")
+                response = await self._get(f"https://api.deezer.com/track/{deezer_track_id}")
                 if response.status_code == 200:
                     deezer_info = response.json()
             except:
@@ -815,7 +838,7 @@ class AudioService:
         elif not deezer_info and query:
             # No ISRC - search by query (for ListenBrainz tracks)
             try:
-                response = await self.client.get(
+                response = await self._get(
                     "https://api.deezer.com/search/track",
                     params={"q": query, "limit": 1}
                 )
@@ -849,7 +872,7 @@ class AudioService:
                 cover_url = deezer_info.get("album", {}).get("cover_xl")
                 if cover_url:
                     try:
-                        cover_resp = await self.client.get(cover_url)
+                        cover_resp = await self._get(cover_url)
                         if cover_resp.status_code == 200:
                             meta["album_art_data"] = cover_resp.content
                     except: pass
@@ -1069,7 +1092,7 @@ class AudioService:
         if isinstance(flac_data, str) and flac_data.startswith("http"):
             logger.info(f"Downloading audio from stream URL for batch download...")
             try:
-                response = await self.client.get(flac_data, timeout=180.0)
+                response = await self._get(flac_data, timeout=180.0)
                 if response.status_code == 200:
                     flac_data = response.content
                     logger.info(f"Downloaded {len(flac_data) / 1024 / 1024:.2f} MB from stream URL")
@@ -1095,7 +1118,7 @@ class AudioService:
             # Download album art from provided URL if we don't have art data
             if not metadata.get("album_art_data") and provided_metadata.get("album_art_url"):
                 try:
-                    art_resp = await self.client.get(provided_metadata["album_art_url"])
+                    art_resp = await self._get(provided_metadata["album_art_url"])
                     if art_resp.status_code == 200:
                         metadata["album_art_data"] = art_resp.content
                         logger.info("Downloaded album art from provided URL")
@@ -1131,7 +1154,7 @@ class AudioService:
                 # Use MusicBrainz cover art if we don't have one
                 if not metadata.get("album_art_data") and mb_data.get("cover_art_url"):
                     try:
-                        cover_resp = await self.client.get(mb_data["cover_art_url"])
+                        cover_resp = await self._get(mb_data["cover_art_url"])
                         if cover_resp.status_code == 200:
                             metadata["album_art_data"] = cover_resp.content
                             logger.info("Using cover art from Cover Art Archive")
@@ -1170,8 +1193,8 @@ class AudioService:
         return None
     
     async def close(self):
-        """Close the HTTP client."""
-        await self.client.aclose()
+        """Close the HTTP client if owned, then the Dab service."""
+        await super().close()
         # Close Dab Service
         try:
             from app.dab_service import dab_service
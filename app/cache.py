@@ -1,13 +1,15 @@
 """
 Cache service for storing transcoded audio files.
 Implements auto-cleanup to stay within storage limits.
+Also provides an optional Redis-backed JSON cache for API metadata.
 """
 import os
 import time
 import asyncio
 import aiofiles
+import orjson
 from pathlib import Path
-from typing import Optional
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
 import logging
 
 logger = logging.getLogger(__name__)
@@ -19,6 +21,11 @@ CACHE_DIR = Path(os.environ.get("CACHE_DIR", _default_cache))
 MAX_CACHE_SIZE_MB = int(os.environ.get("MAX_CACHE_SIZE_MB", "500"))
 CACHE_TTL_HOURS = int(os.environ.get("CACHE_TTL_HOURS", "24"))
 
+# Optional shared metadata cache (survives restarts, shared across workers)
+REDIS_URL = os.environ.get("REDIS_URL", "")
+_redis = None
+_redis_disabled = False
+
 
 def ensure_cache_dir():
     """Ensure cache directory exists."""
@@ -133,3 +140,118 @@ async def periodic_cleanup(interval_minutes: int = 30):
     while True:
         await asyncio.sleep(interval_minutes * 60)
         await cleanup_cache()
+
+
+# ========== REDIS METADATA CACHE ==========
+
+def get_redis():
+    """Lazily connect to Redis. Returns None if REDIS_URL is unset or redis isn't installed."""
+    global _redis, _redis_disabled
+    if _redis is not None or _redis_disabled:
+        return _redis
+    if not REDIS_URL:
+        _redis_disabled = True
+        return None
+    try:
+        import redis.asyncio as aioredis
+    except ImportError:
+        logger.warning("redis not installed - shared metadata cache disabled")
+        _redis_disabled = True
+        return None
+    _redis = aioredis.from_url(REDIS_URL)
+    logger.info("Redis metadata cache enabled")
+    return _redis
+
+
+async def get_cached_json(key: str) -> Optional[Any]:
+    """Retrieve a JSON value from Redis, or None on miss/unavailable."""
+    redis = get_redis()
+    if redis is None:
+        return None
+    try:
+        cached = await redis.get(key)
+        return orjson.loads(cached) if cached is not None else None
+    except Exception as e:
+        logger.error(f"Redis get error for {key}: {e}")
+        return None
+
+
+async def get_cached_raw(key: str) -> Optional[bytes]:
+    """Retrieve the stored JSON bytes from Redis without decoding them, or None on miss/unavailable."""
+    redis = get_redis()
+    if redis is None:
+        return None
+    try:
+        return await redis.get(key)
+    except Exception as e:
+        logger.error(f"Redis get error for {key}: {e}")
+        return None
+
+
+async def cache_json(key: str, value: Any, ttl: int) -> bool:
+    """Store a JSON-serializable value (dicts, lists, dataclasses) in Redis with a TTL in seconds."""
+    redis = get_redis()
+    if redis is None:
+        return False
+    try:
+        await redis.setex(key, ttl, orjson.dumps(value))
+        return True
+    except Exception as e:
+        logger.error(f"Redis set error for {key}: {e}")
+        return False
+
+
+async def get_cached_json_many(keys: List[str]) -> List[Optional[Any]]:
+    """Retrieve several JSON values in one MGET round-trip (None for each miss, all None if unavailable)."""
+    redis = get_redis()
+    if redis is None or not keys:
+        return [None] * len(keys)
+    try:
+        return [orjson.loads(v) if v is not None else None for v in await redis.mget(keys)]
+    except Exception as e:
+        logger.error(f"Redis mget error: {e}")
+        return [None] * len(keys)
+
+
+async def cache_json_many(items: Dict[str, Any], ttl: int) -> bool:
+    """Store several JSON-serializable values with a shared TTL in one pipelined round-trip."""
+    redis = get_redis()
+    if redis is None or not items:
+        return False
+    try:
+        async with redis.pipeline(transaction=False) as pipe:
+            for key, value in items.items():
+                pipe.setex(key, ttl, orjson.dumps(value))
+            await pipe.execute()
+        return True
+    except Exception as e:
+        logger.error(f"Redis pipeline set error: {e}")
+        return False
+
+
+# ========== REQUEST COALESCING ==========
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical requests: while a fetch for a key is in
+    flight, later callers await the same result instead of re-fetching.
+    """
+    
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+    
+    async def do(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._inflight.get(key)
+        if task is None:
+            # The fetch runs in its own task so a cancelled caller (e.g. a client
+            # disconnect) doesn't abort the fetch for everyone else waiting on it
+            task = asyncio.ensure_future(fetch())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._done(key, t))
+        return await asyncio.shield(task)
+    
+    def _done(self, key: Hashable, task: asyncio.Task):
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            task.exception()  # Mark retrieved so a fetch nobody awaits doesn't log
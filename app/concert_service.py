@@ -4,11 +4,20 @@ Provides upcoming concert search for artists
 """
 
 import os
+import re
+import time
+import heapq
 import httpx
+import msgspec
+import orjson
 import logging
-from typing import List, Dict, Optional, Any
+from operator import attrgetter
+from typing import List, Dict, Optional, Any, Tuple
 from datetime import datetime, timedelta
 
+from app.cache import get_cached_json, cache_json, SingleFlight
+from app.http_client import PooledClientMixin
+
 logger = logging.getLogger(__name__)
 
 # API Configuration
@@ -18,19 +27,71 @@ SEATGEEK_CLIENT_ID = os.getenv("SEATGEEK_CLIENT_ID", "")
 TICKETMASTER_BASE = "https://app.ticketmaster.com/discovery/v2"
 SEATGEEK_BASE = "https://api.seatgeek.com/2"
 
+# Concert listings are stable for hours; cache search results for 1 hour
+EVENT_CACHE_TTL = 3600
+EVENT_CACHE_MAX_ENTRIES = 512
+
+# Normalization patterns (compiled once at import)
+_CITY_SUFFIX = re.compile(r"\s+city\s*$", re.IGNORECASE)
+_SLUG_STRIP = re.compile(r"[^a-z0-9]+")
+
+
+class NormalizedEvent(msgspec.Struct, frozen=True, gc=False):
+    """Source-agnostic concert event. Encoded straight to JSON at the API boundary."""
+    id: str
+    name: str
+    artist: str
+    venue: str
+    city: str
+    state: str
+    country: str
+    date: str
+    time: str
+    ticket_url: str
+    price_min: Optional[float]
+    price_max: Optional[float]
+    currency: str
+    image: Optional[str]
+    source: str
+
 
-class ConcertService:
+class ConcertService(PooledClientMixin):
     """Service for fetching upcoming concerts from Ticketmaster and SeatGeek."""
     
-    def __init__(self):
-        self.client = httpx.AsyncClient(timeout=30.0, follow_redirects=True)
+    def __init__(self, client: Optional[httpx.AsyncClient] = None, owns_client: bool = False):
+        self._bind_client(client, owns_client)
+        # L1 in-process cache: key -> (expires_at, events). L2 is Redis (if configured).
+        self._cache: Dict[str, Tuple[float, List[NormalizedEvent]]] = {}
+        # Concurrent identical searches share one upstream request
+        self._inflight = SingleFlight()
+    
+    async def _get_cached_events(self, key: str) -> Optional[List[NormalizedEvent]]:
+        """Look up cached events in the in-process cache, then Redis."""
+        entry = self._cache.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[1]
+        
+        cached = await get_cached_json(key)
+        if cached is not None:
+            events = msgspec.convert(cached, List[NormalizedEvent])
+            self._cache[key] = (time.monotonic() + EVENT_CACHE_TTL, events)
+            return events
+        return None
+    
+    async def _cache_events(self, key: str, events: List[NormalizedEvent]):
+        """Store events in both cache tiers."""
+        if len(self._cache) >= EVENT_CACHE_MAX_ENTRIES:
+            now = time.monotonic()
+            self._cache = {k: v for k, v in self._cache.items() if v[0] > now}
+        self._cache[key] = (time.monotonic() + EVENT_CACHE_TTL, events)
+        await cache_json(key, msgspec.to_builtins(events), EVENT_CACHE_TTL)
     
     async def search_ticketmaster(
         self, 
         artist: str, 
         city: Optional[str] = None,
         limit: int = 10
-    ) -> List[Dict[str, Any]]:
+    ) -> List[NormalizedEvent]:
         """
         Search Ticketmaster Discovery API for events.
         
@@ -46,6 +107,19 @@ class ConcertService:
             logger.warning("TICKETMASTER_API_KEY not set")
             return []
         
+        cache_key = f"tm:{artist.lower()}:{(city or '').lower()}:{limit}"
+        cached = await self._get_cached_events(cache_key)
+        if cached is not None:
+            return cached
+        
+        return await self._inflight.do(
+            cache_key, lambda: self._fetch_ticketmaster(artist, city, limit, cache_key)
+        )
+    
+    async def _fetch_ticketmaster(
+        self, artist: str, city: Optional[str], limit: int, cache_key: str
+    ) -> List[NormalizedEvent]:
+        """Query Ticketmaster and cache non-empty results."""
         try:
             params = {
                 "apikey": TICKETMASTER_API_KEY,
@@ -57,7 +131,7 @@ class ConcertService:
             
             # Normalize city name (remove "City" suffix, common variants)
             if city:
-                normalized_city = city.replace(" City", "").replace(" city", "").strip()
+                normalized_city = _CITY_SUFFIX.sub("", city).strip()
                 params["city"] = normalized_city
             
             response = await self.client.get(
@@ -69,8 +143,7 @@ class ConcertService:
                 logger.error(f"Ticketmaster API error: {response.status_code}")
                 return []
             
-            data = response.json()
-            events = data.get("_embedded", {}).get("events", [])
+            events = self._parse_ticketmaster_events(response.content)
             
             logger.info(f"Ticketmaster returned {len(events)} events for '{artist}'")
             
@@ -83,17 +156,24 @@ class ConcertService:
                     params=params
                 )
                 if response.status_code == 200:
-                    data = response.json()
-                    events = data.get("_embedded", {}).get("events", [])
+                    events = self._parse_ticketmaster_events(response.content)
                     logger.info(f"Ticketmaster (no city) returned {len(events)} events")
             
-            return [self._normalize_ticketmaster_event(e) for e in events]
+            results = [self._normalize_ticketmaster_event(e) for e in events]
+            if results:
+                await self._cache_events(cache_key, results)
+            return results
             
         except Exception as e:
             logger.error(f"Ticketmaster search error: {e}")
             return []
     
-    def _normalize_ticketmaster_event(self, event: Dict) -> Dict[str, Any]:
+    @staticmethod
+    def _parse_ticketmaster_events(content: bytes) -> List[Dict]:
+        """Extract only the event list; the rest of the envelope is released immediately."""
+        return orjson.loads(content).get("_embedded", {}).get("events", [])
+    
+    def _normalize_ticketmaster_event(self, event: Dict) -> NormalizedEvent:
         """Convert Ticketmaster event to normalized format."""
         # Get venue info
         venues = event.get("_embedded", {}).get("venues", [])
@@ -117,30 +197,30 @@ class ConcertService:
         attractions = event.get("_embedded", {}).get("attractions", [])
         artist_name = attractions[0].get("name") if attractions else event.get("name", "")
         
-        return {
-            "id": event.get("id", ""),
-            "name": event.get("name", ""),
-            "artist": artist_name,
-            "venue": venue.get("name", "Unknown Venue"),
-            "city": venue.get("city", {}).get("name", ""),
-            "state": venue.get("state", {}).get("stateCode", ""),
-            "country": venue.get("country", {}).get("countryCode", ""),
-            "date": start.get("localDate", ""),
-            "time": start.get("localTime", ""),
-            "ticket_url": event.get("url", ""),
-            "price_min": price.get("min"),
-            "price_max": price.get("max"),
-            "currency": price.get("currency", "USD"),
-            "image": image,
-            "source": "ticketmaster"
-        }
+        return NormalizedEvent(
+            id=event.get("id", ""),
+            name=event.get("name", ""),
+            artist=artist_name,
+            venue=venue.get("name", "Unknown Venue"),
+            city=venue.get("city", {}).get("name", ""),
+            state=venue.get("state", {}).get("stateCode", ""),
+            country=venue.get("country", {}).get("countryCode", ""),
+            date=start.get("localDate", ""),
+            time=start.get("localTime", ""),
+            ticket_url=event.get("url", ""),
+            price_min=price.get("min"),
+            price_max=price.get("max"),
+            currency=price.get("currency", "USD"),
+            image=image,
+            source="ticketmaster"
+        )
     
     async def search_seatgeek(
         self,
         artist: str,
         city: Optional[str] = None,
         limit: int = 10
-    ) -> List[Dict[str, Any]]:
+    ) -> List[NormalizedEvent]:
         """
         Search SeatGeek API for events (fallback).
         
@@ -156,9 +236,21 @@ class ConcertService:
             logger.warning("SEATGEEK_CLIENT_ID not set")
             return []
         
+        # SeatGeek is queried by performer only, so city is not part of the key
+        cache_key = f"sg:{artist.lower()}:{limit}"
+        cached = await self._get_cached_events(cache_key)
+        if cached is not None:
+            return cached
+        
+        return await self._inflight.do(
+            cache_key, lambda: self._fetch_seatgeek(artist, limit, cache_key)
+        )
+    
+    async def _fetch_seatgeek(self, artist: str, limit: int, cache_key: str) -> List[NormalizedEvent]:
+        """Query SeatGeek and cache non-empty results."""
         try:
             # Use performers.slug for better matching (slugify artist name)
-            artist_slug = artist.lower().replace(" ", "-").replace("'", "")
+            artist_slug = _SLUG_STRIP.sub("-", artist.lower().replace("'", "")).strip("-")
             
             params = {
                 "client_id": SEATGEEK_CLIENT_ID,
@@ -176,7 +268,7 @@ class ConcertService:
                 logger.error(f"SeatGeek API error: {response.status_code}")
                 return []
             
-            data = response.json()
+            data = orjson.loads(response.content)
             events = data.get("events", [])
             
             logger.info(f"SeatGeek returned {len(events)} events for '{artist}'")
@@ -196,17 +288,20 @@ class ConcertService:
                     params=params
                 )
                 if response.status_code == 200:
-                    data = response.json()
+                    data = orjson.loads(response.content)
                     events = data.get("events", [])
                     logger.info(f"SeatGeek (q=) returned {len(events)} events")
             
-            return [self._normalize_seatgeek_event(e) for e in events]
+            results = [self._normalize_seatgeek_event(e) for e in events]
+            if results:
+                await self._cache_events(cache_key, results)
+            return results
             
         except Exception as e:
             logger.error(f"SeatGeek search error: {e}")
             return []
     
-    def _normalize_seatgeek_event(self, event: Dict) -> Dict[str, Any]:
+    def _normalize_seatgeek_event(self, event: Dict) -> NormalizedEvent:
         """Convert SeatGeek event to normalized format."""
         venue = event.get("venue", {})
         performers = event.get("performers", [])
@@ -217,40 +312,46 @@ class ConcertService:
         date_str = ""
         time_str = ""
         if datetime_utc:
-            try:
-                dt = datetime.fromisoformat(datetime_utc.replace("Z", "+00:00"))
-                date_str = dt.strftime("%Y-%m-%d")
-                time_str = dt.strftime("%H:%M:%S")
-            except:
-                pass
+            # Fast path for the usual "YYYY-MM-DDTHH:MM:SS[Z]" shape
+            date_part, sep, time_part = datetime_utc.rstrip("Z").partition("T")
+            if sep and len(date_part) == 10 and len(time_part) >= 8:
+                date_str = date_part
+                time_str = time_part[:8]
+            else:
+                try:
+                    dt = datetime.fromisoformat(datetime_utc.replace("Z", "+00:00"))
+                    date_str = dt.strftime("%Y-%m-%d")
+                    time_str = dt.strftime("%H:%M:%S")
+                except:
+                    pass
         
         # Get stats for pricing
         stats = event.get("stats", {})
         
-        return {
-            "id": str(event.get("id", "")),
-            "name": event.get("title", ""),
-            "artist": performer.get("name", event.get("title", "")),
-            "venue": venue.get("name", "Unknown Venue"),
-            "city": venue.get("city", ""),
-            "state": venue.get("state", ""),
-            "country": venue.get("country", ""),
-            "date": date_str,
-            "time": time_str,
-            "ticket_url": event.get("url", ""),
-            "price_min": stats.get("lowest_price"),
-            "price_max": stats.get("highest_price"),
-            "currency": "USD",
-            "image": performer.get("image"),
-            "source": "seatgeek"
-        }
+        return NormalizedEvent(
+            id=str(event.get("id", "")),
+            name=event.get("title", ""),
+            artist=performer.get("name", event.get("title", "")),
+            venue=venue.get("name", "Unknown Venue"),
+            city=venue.get("city", ""),
+            state=venue.get("state", ""),
+            country=venue.get("country", ""),
+            date=date_str,
+            time=time_str,
+            ticket_url=event.get("url", ""),
+            price_min=stats.get("lowest_price"),
+            price_max=stats.get("highest_price"),
+            currency="USD",
+            image=performer.get("image"),
+            source="seatgeek"
+        )
     
     async def search_events(
         self,
         artist: str,
         city: Optional[str] = None,
         limit: int = 10
-    ) -> List[Dict[str, Any]]:
+    ) -> List[NormalizedEvent]:
         """
         Search for events with Ticketmaster primary, SeatGeek fallback.
         
@@ -277,7 +378,7 @@ class ConcertService:
         artists: List[str],
         cities: Optional[List[str]] = None,
         limit_per_artist: int = 5
-    ) -> List[Dict[str, Any]]:
+    ) -> List[NormalizedEvent]:
         """
         Get upcoming events for multiple artists.
         
@@ -289,35 +390,42 @@ class ConcertService:
         Returns:
             List of all events, sorted by date
         """
-        all_events = []
+        # Each source returns events sorted by date (asc), so keep the
+        # per-search lists separate and merge them instead of re-sorting
+        event_lists = []
         
         for artist in artists[:10]:  # Limit to 10 artists to avoid rate limits
             if cities:
                 # Search each city
                 for city in cities[:3]:  # Limit to 3 cities
-                    events = await self.search_events(artist, city, limit_per_artist)
-                    all_events.extend(events)
+                    event_lists.append(await self.search_events(artist, city, limit_per_artist))
             else:
-                events = await self.search_events(artist, None, limit_per_artist)
-                all_events.extend(events)
+                event_lists.append(await self.search_events(artist, None, limit_per_artist))
         
-        # Deduplicate by event ID
+        # Merge by date and deduplicate by (source, event ID) in one pass
         seen_ids = set()
         unique_events = []
-        for event in all_events:
-            event_id = f"{event['source']}_{event['id']}"
-            if event_id not in seen_ids:
-                seen_ids.add(event_id)
+        for event in heapq.merge(*event_lists, key=attrgetter("date")):
+            event_key = (event.source, event.id)
+            if event_key not in seen_ids:
+                seen_ids.add(event_key)
                 unique_events.append(event)
         
-        # Sort by date
-        unique_events.sort(key=lambda e: e.get("date", "9999-99-99"))
-        
         return unique_events
     
-    async def close(self):
-        """Close the HTTP client."""
-        await self.client.aclose()
+    async def warm_up(self):
+        """Open pooled connections to configured APIs so the first search skips the TLS handshake."""
+        bases = []
+        if TICKETMASTER_API_KEY:
+            bases.append(TICKETMASTER_BASE)
+        if SEATGEEK_CLIENT_ID:
+            bases.append(SEATGEEK_BASE)
+        for base in bases:
+            try:
+                await self.client.head(base)
+            except Exception as e:
+                logger.debug(f"Concert warm-up failed for {base}: {e}")
+    
 
 
 # Singleton instance
@@ -2,27 +2,47 @@
 Dab Music Service
 Retrieves Hi-Res audio from Dab Music API.
 """
+import asyncio
 import httpx
+import orjson
 import logging
 from typing import Optional, List, Dict, Any
 import os
 
+from app.http_client import PooledClientMixin, build_client
+
 logger = logging.getLogger(__name__)
 
-class DabService:
+
+def _extract_name(obj: Any) -> Optional[str]:
+    """Get a display name from a Dab artist field (object or plain string)."""
+    if type(obj) is dict:
+        return obj.get("name")
+    if type(obj) is str:
+        return obj
+    return None
+
+
+class DabService(PooledClientMixin):
     BASE_URL = "https://dabmusic.xyz/api"
     
+    TIMEOUT = 15.0
+    
     def __init__(self):
-        self._initialized = False
         self.client = None
         self.session_token = ""
         self.visitor_id = ""
         
-    def _ensure_initialized(self):
-        """Lazy initialization - loads credentials on first use, not import time."""
-        if self._initialized:
-            return
-            
+    async def startup(self, client: Optional[httpx.AsyncClient] = None, owns_client: bool = False):
+        """Load credentials and bind the HTTP client. Awaited once from the app lifespan."""
+        self._setup(client, owns_client)
+    
+    def _ensure_started(self):
+        """Lazy setup for callers outside the app lifespan (scripts, tests)."""
+        if self.client is None:
+            self._setup()
+    
+    def _setup(self, client: Optional[httpx.AsyncClient] = None, owns_client: bool = False):
         # Load credentials at runtime (not import time) for cloud deployment compatibility
         self.session_token = os.getenv("DAB_SESSION", "")
         self.visitor_id = os.getenv("DAB_VISITOR_ID", "")
@@ -33,39 +53,72 @@ class DabService:
         else:
             logger.warning("Dab credentials not found - Hi-Res streaming will be unavailable")
         
+        self.cookies = {
+            "session": self.session_token,
+            "visitor_id": self.visitor_id
+        }
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
             "Referer": "https://dabmusic.xyz/",
             "Origin": "https://dabmusic.xyz"
         }
-        self.cookies = {
-            "session": self.session_token,
-            "visitor_id": self.visitor_id
-        }
         
-        self.client = httpx.AsyncClient(
+        if client is None:
+            # Own cookie jar (same pool settings as the shared client) so the session
+            # survives redirects and picks up cookies Dab rotates via Set-Cookie
+            client, owns_client = build_client(cookies=self.cookies), True
+        self._bind_client(client, owns_client)
+
+    async def _get(self, endpoint: str, params: Dict[str, Any]) -> httpx.Response:
+        """GET a Dab API endpoint with session headers."""
+        self._ensure_started()
+        return await self.client.get(
+            f"{self.BASE_URL}/{endpoint}",
+            params=params,
             headers=self.headers,
-            cookies=self.cookies,
-            timeout=15.0,
-            follow_redirects=True
+            timeout=self.TIMEOUT
         )
-        self._initialized = True
+
+    async def _race_get(self, endpoints: List[str], params: Dict[str, Any]) -> httpx.Response:
+        """
+        Request equivalent endpoints concurrently and return the first 200 response.
+        Falls back to the last non-200 response if none succeed.
+        """
+        pending = {
+            asyncio.create_task(self._get(endpoint, params))
+            for endpoint in endpoints
+        }
+        last_resp = None
+        last_error = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        last_error = task.exception()
+                        continue
+                    resp = task.result()
+                    if resp.status_code == 200:
+                        return resp
+                    last_resp = resp
+        finally:
+            for task in pending:
+                task.cancel()
+        
+        if last_resp is None:
+            raise last_error
+        return last_resp
 
     async def search_tracks(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Search for tracks on Dab Music."""
-        self._ensure_initialized()
         try:
-            resp = await self.client.get(
-                f"{self.BASE_URL}/search",
-                params={"q": query, "type": "track", "limit": limit}
-            )
+            resp = await self._get("search", {"q": query, "type": "track", "limit": limit})
             if resp.status_code == 200:
-                data = resp.json()
+                data = orjson.loads(resp.content)
                 tracks = data.get("tracks", [])
                 
-                 # Debug logging
-                if tracks and len(tracks) > 0:
-                    logger.info(f"Dab Search Track 0: {type(tracks[0])} - {str(tracks[0])[:50]}...")
+                if tracks and logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Dab Search Track 0: {type(tracks[0])} - {str(tracks[0])[:50]}...")
 
                 return [self._format_track(t) for t in tracks if isinstance(t, dict)]
             elif resp.status_code == 401:
@@ -79,19 +132,14 @@ class DabService:
 
     async def search_albums(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
         """Search for albums on Dab Music."""
-        self._ensure_initialized()
         try:
-            resp = await self.client.get(
-                f"{self.BASE_URL}/search",
-                params={"q": query, "type": "album", "limit": limit}
-            )
+            resp = await self._get("search", {"q": query, "type": "album", "limit": limit})
             if resp.status_code == 200:
-                data = resp.json()
+                data = orjson.loads(resp.content)
                 albums = data.get("albums", [])
                 
-                # Debug logging
-                if albums and len(albums) > 0:
-                    logger.info(f"Dab Search Album 0: {type(albums[0])} - {albums[0]}")
+                if albums and logger.isEnabledFor(logging.DEBUG):
+                    logger.debug(f"Dab Search Album 0: {type(albums[0])} - {albums[0]}")
                 
                 return [self._format_album(a) for a in albums if isinstance(a, dict)]
             return []
@@ -101,38 +149,28 @@ class DabService:
 
     async def get_album(self, album_id: str) -> Optional[Dict[str, Any]]:
         """Get album details with tracks."""
-        self._ensure_initialized()
         try:
-            clean_id = album_id.replace("dab_", "")
-            # Try getAlbum endpoint first (based on test results, /getAlbum works usually if /album fails)
-            # Actually test showed 404 for all... Wait, I need to be careful.
-            # But earlier test showed /album and /getAlbum failing with 400/404.
-            # BUT web interface uses: /api/get?id=... (from observation usually)
-            # Or /api/album?id=...
-            # I will try /getAlbum based on typical Qobuz proxies, or fallback to search if needed?
-            # actually if the test failed, I might need to rely on what I saw in other code or assume /getAlbum or /album.
-            # Let's try /getAlbum with 'albumId' param as that is specific to Dab often.
-            
-            resp = await self.client.get(f"{self.BASE_URL}/getAlbum", params={"albumId": clean_id})
-            if resp.status_code != 200:
-                 resp = await self.client.get(f"{self.BASE_URL}/album", params={"albumId": clean_id})
+            clean_id = album_id.removeprefix("dab_")
+            # Dab exposes album lookups on both /getAlbum and /album; race them
+            resp = await self._race_get(["getAlbum", "album"], {"albumId": clean_id})
             
             if resp.status_code == 200:
-                data = resp.json()
+                data = orjson.loads(resp.content)
                 
                 # Check for nested 'album' key which is common in getAlbum/album endpoints
                 album_data = data.get("album", data)
                 
-                # Debug logging for album metadata
-                logger.info(f"Dab Raw Album Data keys: {album_data.keys()}")
-                logger.info(f"Dab Raw Album Release Date: {album_data.get('releaseDate')} / {album_data.get('release_date')}")
-                logger.info(f"Dab Raw Album Images: {album_data.get('images')}")
-                logger.info(f"Dab Raw Album Cover: {album_data.get('cover')}")
+                debug = logger.isEnabledFor(logging.DEBUG)
+                if debug:
+                    logger.debug(f"Dab Raw Album Data keys: {list(album_data.keys())}")
+                    logger.debug(f"Dab Raw Album Release Date: {album_data.get('releaseDate')} / {album_data.get('release_date')}")
+                    logger.debug(f"Dab Raw Album Images: {album_data.get('images')}")
+                    logger.debug(f"Dab Raw Album Cover: {album_data.get('cover')}")
                 
                 album = self._format_album(album_data)
                 
-                # Log formatted album data
-                logger.info(f"Formatted Dab Album: year={album.get('release_date')}, art={album.get('album_art')}")
+                if debug:
+                    logger.debug(f"Formatted Dab Album: year={album.get('release_date')}, art={album.get('album_art')}")
                 
                 tracks = []
                 # Tracks are usually inside the album object or 'tracks' key
@@ -155,92 +193,89 @@ class DabService:
 
     def _format_track(self, item: dict, album_info: dict = None) -> dict:
         """Format Dab track to frontend schema."""
-        # Clean ID
-        track_id = str(item.get("id"))
+        get = item.get
+        album = get("album")
+        if type(album) is not dict:
+            album = {}
         
         # Album info might come from item or parent
-        alb_title = item.get("albumTitle") or item.get("album", {}).get("title")
+        alb_title = get("albumTitle") or album.get("title")
         if album_info: alb_title = alb_title or album_info.get("title")
         
-        alb_cover = item.get("albumCover") or item.get("album", {}).get("cover")
+        alb_cover = get("albumCover") or album.get("cover")
         if not alb_cover and album_info: 
              alb_cover = album_info.get("image", {}).get("large") or album_info.get("cover")
 
         # Artist
-        artist_obj = item.get("artist")
-        if isinstance(artist_obj, dict):
-            artist_name = artist_obj.get("name")
-        else:
-            artist_name = artist_obj
-            
+        artist_name = _extract_name(get("artist"))
         if not artist_name and album_info:
-            artist_val = album_info.get("artist")
-            if isinstance(artist_val, dict):
-                artist_name = artist_val.get("name")
-            else:
-                artist_name = artist_val
+            artist_name = _extract_name(album_info.get("artist"))
 
+        duration_ms = get("duration", 0) * 1000
+        audio_quality = get("audioQuality")
+        
         return {
-            "id": f"dab_{track_id}",
+            "id": f"dab_{get('id')}",
             "type": "track",
-            "name": item.get("title", "Unknown"),
+            "name": get("title", "Unknown"),
             "artists": artist_name,
             "artist_names": [artist_name],
             "album": alb_title,
-            "album_id": f"dab_{item.get('albumId') or (album_info['id'] if album_info else '')}",
+            "album_id": f"dab_{get('albumId') or (album_info['id'] if album_info else '')}",
             "album_art": alb_cover,
-            "duration_ms": item.get("duration", 0) * 1000,
-            "duration": self._format_duration(item.get("duration", 0) * 1000),
-            "isrc": item.get("isrc"), # Dab often provides isrc
-            "release_date": item.get("releaseDate", ""),
+            "duration_ms": duration_ms,
+            "duration": self._format_duration(duration_ms),
+            "isrc": get("isrc"), # Dab often provides isrc
+            "release_date": get("releaseDate", ""),
             "source": "dab",
-            "is_hi_res": item.get("audioQuality", {}).get("isHiRes", False)
+            "is_hi_res": audio_quality.get("isHiRes", False) if type(audio_quality) is dict else False
         }
 
     def _format_album(self, item: dict) -> dict:
         """Format Dab album to frontend schema."""
+        get = item.get
+        
         # Extract images
-        images = item.get("images", {})
+        images = get("images")
         cover = None
-        if isinstance(images, dict):
+        if type(images) is dict:
             cover = images.get("large") or images.get("medium") 
         
-        if not cover: cover = item.get("cover") # Fallback to top level
-        if not cover: cover = item.get("image", {}).get("large") # Another possible structure
+        if not cover: cover = get("cover") # Fallback to top level
+        if not cover: cover = get("image", {}).get("large") # Another possible structure
         
-        if isinstance(cover, dict): cover = cover.get("large") # Handle nested cases
+        if type(cover) is dict: cover = cover.get("large") # Handle nested cases
 
         # Handle Artist
-        artist_obj = item.get("artist")
-        if isinstance(artist_obj, dict):
-            artist_name = artist_obj.get("name")
-        elif isinstance(artist_obj, list) and artist_obj:
-             artist_name = artist_obj[0].get("name")
+        artist_obj = get("artist")
+        if type(artist_obj) is list and artist_obj:
+            artist_name = _extract_name(artist_obj[0])
         else:
-            artist_name = artist_obj or item.get("artistName")
+            artist_name = _extract_name(artist_obj) or get("artistName")
 
         # Extract audio quality info
-        audio_quality = item.get("audioQuality", {})
+        audio_quality = get("audioQuality") or {}
+        is_hi_res = audio_quality.get("isHiRes", False)
         
         # Robust release date extraction
-        release_date = item.get("releaseDate") or item.get("release_date") or item.get("date") or ""
+        release_date = get("releaseDate") or get("release_date") or get("date") or ""
         
         return {
-            "id": f"dab_{item.get('id')}",
+            "id": f"dab_{get('id')}",
             "type": "album",
-            "name": item.get("title", ""),
+            "name": get("title", ""),
             "artists": artist_name,
             "album_art": cover,
             "release_date": release_date,
-            "total_tracks": item.get("trackCount") or item.get("tracksCount") or 0,
+            "total_tracks": get("trackCount") or get("tracksCount") or 0,
             "source": "dab",
-            "is_hi_res": audio_quality.get("isHiRes", False),
+            "is_hi_res": is_hi_res,
             "audio_quality": {
                 "maximumBitDepth": audio_quality.get("maximumBitDepth", 16),
                 "maximumSamplingRate": audio_quality.get("maximumSamplingRate", 44.1),
-                "isHiRes": audio_quality.get("isHiRes", False)
+                "isHiRes": is_hi_res
             },
-            "format": "FLAC" if audio_quality.get("isHiRes", False) else "FLAC"
+            "format": "FLAC"
         }
 
     def _format_duration(self, ms: int) -> str:
@@ -251,23 +286,13 @@ class DabService:
 
     async def get_track(self, track_id: str) -> Optional[Dict[str, Any]]:
         """Get track details by ID."""
-        self._ensure_initialized()
         try:
-            clean_id = str(track_id).replace("dab_", "")
-            # Try getTrack endpoint first
-            resp = await self.client.get(
-                f"{self.BASE_URL}/getTrack",
-                params={"trackId": clean_id}
-            )
-            if resp.status_code != 200:
-                # Fallback to track endpoint
-                resp = await self.client.get(
-                    f"{self.BASE_URL}/track",
-                    params={"trackId": clean_id}
-                )
+            clean_id = str(track_id).removeprefix("dab_")
+            # Race /getTrack and /track, take whichever succeeds first
+            resp = await self._race_get(["getTrack", "track"], {"trackId": clean_id})
             
             if resp.status_code == 200:
-                data = resp.json()
+                data = orjson.loads(resp.content)
                 # Check for nested 'track' key
                 track_data = data.get("track", data)
                 return self._format_track(track_data)
@@ -280,15 +305,11 @@ class DabService:
 
     async def get_stream_url(self, track_id: str, quality: str = "27") -> Optional[str]:
         """Get stream URL for a track. Quality 27=Hi-Res, 7=Lossless."""
-        self._ensure_initialized()
         try:
-            clean_id = str(track_id).replace("dab_", "")
-            resp = await self.client.get(
-                f"{self.BASE_URL}/stream",
-                params={"trackId": clean_id, "quality": quality} 
-            )
+            clean_id = str(track_id).removeprefix("dab_")
+            resp = await self._get("stream", {"trackId": clean_id, "quality": quality})
             if resp.status_code == 200:
-                data = resp.json()
+                data = orjson.loads(resp.content)
                 return data.get("url")
             logger.warning(f"Dab stream fetch failed: {resp.status_code} - {resp.text}")
             return None
@@ -296,8 +317,14 @@ class DabService:
             logger.error(f"Dab stream error: {e}")
             return None
 
-    async def close(self):
-        await self.client.aclose()
+    async def warm_up(self):
+        """Prime the connection pool with a cheap search so the first user request skips the handshake."""
+        if not self.session_token:
+            return
+        try:
+            await self._get("search", {"q": "a", "type": "track", "limit": 1})
+        except Exception as e:
+            logger.debug(f"Dab warm-up failed: {e}")
 
 # Singleton
 dab_service = DabService()
@@ -3,52 +3,115 @@ Deezer service for Freedify.
 Provides search (tracks, albums, artists) as fallback when Spotify is rate limited.
 Deezer API is free and doesn't require authentication for basic searches.
 """
+import asyncio
+import random
+import time
 import httpx
+from cachetools import TTLCache
 from typing import Optional, Dict, List, Any
 import logging
 
+from app.cache import SingleFlight
+from app.http_client import PooledClientMixin
+
 logger = logging.getLogger(__name__)
 
+# Rate-limit handling
+MAX_CONCURRENT_REQUESTS = 8
+MAX_RETRIES = 3
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+DEEZER_QUOTA_ERROR = 4  # Deezer reports quota exhaustion as HTTP 200 + error code 4
+
 
-class DeezerService:
+class DeezerService(PooledClientMixin):
     """Service for searching and fetching metadata from Deezer."""
     
     API_BASE = "https://api.deezer.com"
+    TIMEOUT = httpx.Timeout(30.0, connect=5.0)
     
-    def __init__(self):
-        self.client = httpx.AsyncClient(timeout=30.0)
+    def __init__(self, client: Optional[httpx.AsyncClient] = None, owns_client: bool = False):
+        self._bind_client(client, owns_client)
+        # Deezer responses are highly repeatable within a session
+        self._cache = TTLCache(maxsize=2048, ttl=300)
+        self._inflight = SingleFlight()
+        self._sem = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+        self._retry_after_until = 0.0
     
     async def _api_request(self, endpoint: str, params: dict = None) -> dict:
-        """Make API request to Deezer."""
-        response = await self.client.get(f"{self.API_BASE}{endpoint}", params=params)
+        """Make API request to Deezer (cached, with concurrent duplicates coalesced)."""
+        key = (endpoint, tuple(sorted((params or {}).items())))
+        cached = self._cache.get(key)
+        if cached is not None:
+            return cached
+        return await self._inflight.do(key, lambda: self._fetch(key, endpoint, params))
+    
+    async def _fetch(self, key: tuple, endpoint: str, params: Optional[dict]) -> dict:
+        """Fetch from Deezer with backoff on throttling, and populate the cache."""
+        async with self._sem:
+            for attempt in range(MAX_RETRIES + 1):
+                # Honor any Retry-After window set by a previous response
+                wait = self._retry_after_until - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                
+                response = await self.client.get(f"{self.API_BASE}{endpoint}", params=params, timeout=self.TIMEOUT)
+                data = None
+                if response.status_code not in RETRY_STATUSES:
+                    response.raise_for_status()
+                    data = response.json()
+                    error = data.get("error") if isinstance(data, dict) else None
+                    if not error:
+                        self._cache[key] = data
+                        return data
+                    if error.get("code") != DEEZER_QUOTA_ERROR:
+                        return data
+                
+                if attempt == MAX_RETRIES:
+                    break
+                delay = self._parse_retry_after(response) or (2 ** attempt + random.random())
+                self._retry_after_until = max(self._retry_after_until, time.monotonic() + delay)
+                logger.warning(f"Deezer throttled ({response.status_code}) on {endpoint}, retrying in {delay:.1f}s")
+        
         response.raise_for_status()
-        return response.json()
+        return data
+    
+    @staticmethod
+    def _parse_retry_after(response: httpx.Response) -> Optional[float]:
+        """Read a Retry-After header given in seconds."""
+        try:
+            return float(response.headers.get("Retry-After", ""))
+        except ValueError:
+            return None
     
     # ========== TRACK METHODS ==========
     
     async def search_tracks(self, query: str, limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
         """Search for tracks."""
         data = await self._api_request("/search/track", {"q": query, "limit": limit, "index": offset})
-        return [self._format_track(item) for item in data.get("data", [])]
+        return list(map(self._format_track, data.get("data", ())))
     
-    def _format_track(self, item: dict) -> dict:
+    @staticmethod
+    def _format_track(item: dict) -> dict:
         """Format track data for frontend (matching Spotify format)."""
-        album = item.get("album", {})
-        artist = item.get("artist", {})
+        get = item.get
+        album = get("album") or {}
+        album_get = album.get
+        artist_name = (get("artist") or {}).get("name", "")
+        duration_ms = get("duration", 0) * 1000
         return {
             "id": f"dz_{item['id']}",
             "type": "track",
-            "name": item.get("title", ""),
-            "artists": artist.get("name", ""),
-            "artist_names": [artist.get("name", "")],
-            "album": album.get("title", ""),
-            "album_id": f"dz_{album.get('id', '')}",
-            "album_art": album.get("cover_xl") or album.get("cover_big") or album.get("cover_medium"),
-            "duration_ms": item.get("duration", 0) * 1000,
-            "duration": self._format_duration(item.get("duration", 0) * 1000),
-            "isrc": item.get("isrc"),
-            "preview_url": item.get("preview"),
-            "release_date": album.get("release_date", ""),
+            "name": get("title", ""),
+            "artists": artist_name,
+            "artist_names": [artist_name],
+            "album": album_get("title", ""),
+            "album_id": f"dz_{album_get('id', '')}",
+            "album_art": album_get("cover_xl") or album_get("cover_big") or album_get("cover_medium"),
+            "duration_ms": duration_ms,
+            "duration": DeezerService._format_duration(duration_ms),
+            "isrc": get("isrc"),
+            "preview_url": get("preview"),
+            "release_date": album_get("release_date", ""),
             "source": "deezer",
         }
     
@@ -57,36 +120,43 @@ class DeezerService:
     async def search_albums(self, query: str, limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
         """Search for albums."""
         data = await self._api_request("/search/album", {"q": query, "limit": limit, "index": offset})
-        return [self._format_album(item) for item in data.get("data", [])]
+        return list(map(self._format_album, data.get("data", ())))
     
     async def get_album(self, album_id: str) -> Optional[Dict[str, Any]]:
         """Get album with all tracks."""
         try:
             # Remove dz_ prefix if present
-            clean_id = album_id.replace("dz_", "")
+            clean_id = album_id.removeprefix("dz_")
             data = await self._api_request(f"/album/{clean_id}")
             album = self._format_album(data)
             
-            # Format tracks
-            tracks = []
-            for item in data.get("tracks", {}).get("data", []):
-                track = {
+            # Album-level fields shared by every track
+            artist_name = data.get("artist", {}).get("name", "")
+            album_title = data.get("title", "")
+            album_art = album["album_art"]
+            album_ref = f"dz_{clean_id}"
+            release_date = data.get("release_date", "")
+            format_duration = self._format_duration
+            
+            tracks = [
+                {
                     "id": f"dz_{item['id']}",
                     "type": "track",
                     "name": item.get("title", ""),
-                    "artists": data.get("artist", {}).get("name", ""),
-                    "artist_names": [data.get("artist", {}).get("name", "")],
-                    "album": data.get("title", ""),
-                    "album_id": f"dz_{clean_id}",
-                    "album_art": album["album_art"],
-                    "duration_ms": item.get("duration", 0) * 1000,
-                    "duration": self._format_duration(item.get("duration", 0) * 1000),
+                    "artists": artist_name,
+                    "artist_names": [artist_name],
+                    "album": album_title,
+                    "album_id": album_ref,
+                    "album_art": album_art,
+                    "duration_ms": (duration_ms := item.get("duration", 0) * 1000),
+                    "duration": format_duration(duration_ms),
                     "isrc": item.get("isrc"),
                     "preview_url": item.get("preview"),
-                    "release_date": data.get("release_date", ""),
+                    "release_date": release_date,
                     "source": "deezer",
                 }
-                tracks.append(track)
+                for item in data.get("tracks", {}).get("data", ())
+            ]
             
             album["tracks"] = tracks
             return album
@@ -94,17 +164,18 @@ class DeezerService:
             logger.error(f"Error fetching Deezer album {album_id}: {e}")
             return None
     
-    def _format_album(self, item: dict) -> dict:
+    @staticmethod
+    def _format_album(item: dict) -> dict:
         """Format album data for frontend."""
-        artist = item.get("artist", {})
+        get = item.get
         return {
             "id": f"dz_{item['id']}",
             "type": "album",
-            "name": item.get("title", ""),
-            "artists": artist.get("name", ""),
-            "album_art": item.get("cover_xl") or item.get("cover_big") or item.get("cover_medium"),
-            "release_date": item.get("release_date", ""),
-            "total_tracks": item.get("nb_tracks", 0),
+            "name": get("title", ""),
+            "artists": (get("artist") or {}).get("name", ""),
+            "album_art": get("cover_xl") or get("cover_big") or get("cover_medium"),
+            "release_date": get("release_date", ""),
+            "total_tracks": get("nb_tracks", 0),
             "source": "deezer",
         }
     
@@ -113,47 +184,56 @@ class DeezerService:
     async def search_artists(self, query: str, limit: int = 20, offset: int = 0) -> List[Dict[str, Any]]:
         """Search for artists."""
         data = await self._api_request("/search/artist", {"q": query, "limit": limit, "index": offset})
-        return [self._format_artist(item) for item in data.get("data", [])]
+        return list(map(self._format_artist, data.get("data", ())))
     
     async def get_artist(self, artist_id: str) -> Optional[Dict[str, Any]]:
         """Get artist info with top tracks."""
         try:
-            clean_id = artist_id.replace("dz_", "")
-            data = await self._api_request(f"/artist/{clean_id}")
+            clean_id = artist_id.removeprefix("dz_")
+            # Artist info and top tracks are independent - fetch both at once
+            data, top_tracks = await asyncio.gather(
+                self._api_request(f"/artist/{clean_id}"),
+                self._api_request(f"/artist/{clean_id}/top", {"limit": 10}),
+                return_exceptions=True
+            )
+            if isinstance(data, BaseException):
+                raise data
             artist = self._format_artist(data)
             
-            # Get top tracks
-            top_tracks = await self._api_request(f"/artist/{clean_id}/top", {"limit": 10})
-            artist["tracks"] = [self._format_track(t) for t in top_tracks.get("data", [])]
+            if isinstance(top_tracks, BaseException):
+                logger.warning(f"Error fetching Deezer top tracks for {artist_id}: {top_tracks}")
+                artist["tracks"] = []
+            else:
+                artist["tracks"] = list(map(self._format_track, top_tracks.get("data", ())))
             
             return artist
         except Exception as e:
             logger.error(f"Error fetching Deezer artist {artist_id}: {e}")
             return None
     
-    def _format_artist(self, item: dict) -> dict:
+    @staticmethod
+    def _format_artist(item: dict) -> dict:
         """Format artist data for frontend."""
+        get = item.get
         return {
             "id": f"dz_{item['id']}",
             "type": "artist",
-            "name": item.get("name", ""),
-            "image": item.get("picture_xl") or item.get("picture_big") or item.get("picture_medium"),
-            "fans": item.get("nb_fan", 0),
+            "name": get("name", ""),
+            "image": get("picture_xl") or get("picture_big") or get("picture_medium"),
+            "fans": get("nb_fan", 0),
             "source": "deezer",
         }
     
     # ========== UTILITIES ==========
     
-    def _format_duration(self, ms: int) -> str:
+    @staticmethod
+    def _format_duration(ms: int) -> str:
         """Format duration from ms to MM:SS."""
         seconds = ms // 1000
         minutes = seconds // 60
         secs = seconds % 60
         return f"{minutes}:{secs:02d}"
     
-    async def close(self):
-        """Close the HTTP client."""
-        await self.client.aclose()
 
 
 # Singleton instance
@@ -3,14 +3,38 @@ DJ Service for Freedify.
 AI-powered setlist generation using Gemini 2.0 Flash.
 """
 import os
+import re
+import time
+import random
+import asyncio
+import hashlib
 import logging
+from collections import deque
 from typing import List, Dict, Any, Optional
 
+import numpy as np
+
+try:
+    import orjson as _json_fast
+except ImportError:
+    import json as _json_fast
+_loads = _json_fast.loads
+
+# JSON payload inside a ```json ... ``` (or bare ```) fence in LLM output
+_JSON_FENCE = re.compile(r"```(?:json)?\s*(\{.*?\}|\[.*?\])\s*```", re.DOTALL)
+
+
+def _extract_json(text: str) -> str:
+    """Return the fenced JSON block from an LLM response, or the whole text if unfenced."""
+    m = _JSON_FENCE.search(text)
+    return m.group(1) if m else text.strip()
+
 logger = logging.getLogger(__name__)
 
 # Camelot wheel compatibility chart
 # Compatible keys: same key, +1/-1 on wheel, switch A/B (relative major/minor)
-CAMELOT_COMPAT = {
+# Values are frozensets so compatibility checks are a single hash probe
+CAMELOT_COMPAT = {k: frozenset(v) for k, v in {
     "1A": ["1A", "1B", "12A", "2A"],
     "1B": ["1B", "1A", "12B", "2B"],
     "2A": ["2A", "2B", "1A", "3A"],
@@ -35,6 +59,104 @@ CAMELOT_COMPAT = {
     "11B": ["11B", "11A", "10B", "12B"],
     "12A": ["12A", "12B", "11A", "1A"],
     "12B": ["12B", "12A", "11B", "1B"],
+}.items()}
+
+_NO_COMPAT: frozenset = frozenset()
+
+# Integer-encoded Camelot keys ("1A".."12B" -> 0..23) for vectorized scoring.
+# Index 24 stands for an unknown key and is compatible with nothing.
+_CAM_TO_INT = {f"{n}{letter}": (n - 1) * 2 + (0 if letter == "A" else 1) for n in range(1, 13) for letter in "AB"}
+_UNKNOWN_CAM = len(_CAM_TO_INT)
+_COMPAT_MATRIX = np.zeros((_UNKNOWN_CAM + 1, _UNKNOWN_CAM + 1), dtype=bool)
+for _key, _compatible in CAMELOT_COMPAT.items():
+    for _other in _compatible:
+        _COMPAT_MATRIX[_CAM_TO_INT[_key], _CAM_TO_INT[_other]] = True
+
+
+def _greedy_order_numpy(bpm: np.ndarray, energy: np.ndarray, cam_idx: np.ndarray, compat: np.ndarray) -> np.ndarray:
+    """
+    Greedy setlist ordering starting from track 0: repeatedly pick the remaining
+    track scoring best against the last one (first index wins ties).
+    Scoring: harmonic (+10), BPM within 5 (+5) or 10 (+3), slight energy increase (+2).
+    """
+    n = bpm.shape[0]
+    remaining = np.ones(n, dtype=bool)
+    remaining[0] = False
+    order = np.zeros(n, dtype=np.intp)
+    
+    for step in range(1, n):
+        last = order[step - 1]
+        bpm_diff = np.abs(bpm - bpm[last])
+        energy_diff = energy - energy[last]
+        score = (
+            10 * compat[cam_idx[last], cam_idx]
+            + 5 * (bpm_diff <= 5)
+            + 3 * ((bpm_diff > 5) & (bpm_diff <= 10))
+            + 2 * ((energy_diff > 0) & (energy_diff < 0.15))
+        )
+        pick = np.argmax(np.where(remaining, score, -1))
+        remaining[pick] = False
+        order[step] = pick
+    
+    return order
+
+
+def _greedy_order_loops(bpm: np.ndarray, energy: np.ndarray, cam_idx: np.ndarray, compat: np.ndarray) -> np.ndarray:
+    """Same algorithm as _greedy_order_numpy, written as typed loops for Numba."""
+    n = bpm.shape[0]
+    remaining = np.ones(n, dtype=np.bool_)
+    remaining[0] = False
+    order = np.zeros(n, dtype=np.intp)
+    
+    for step in range(1, n):
+        last = order[step - 1]
+        best = -1
+        best_score = -1
+        for i in range(n):
+            if not remaining[i]:
+                continue
+            score = 0
+            if compat[cam_idx[last], cam_idx[i]]:
+                score += 10
+            bpm_diff = abs(bpm[i] - bpm[last])
+            if bpm_diff <= 5:
+                score += 5
+            elif bpm_diff <= 10:
+                score += 3
+            energy_diff = energy[i] - energy[last]
+            if 0 < energy_diff < 0.15:
+                score += 2
+            if score > best_score:
+                best_score = score
+                best = i
+        remaining[best] = False
+        order[step] = best
+    
+    return order
+
+
+# JIT-compile the greedy kernel when Numba is available, else use the NumPy version.
+# The explicit signature compiles at import, so the first setlist request doesn't stall the event loop.
+try:
+    import numba
+    _greedy_order = numba.njit("intp[:](float64[:], float64[:], intp[:], boolean[:, :])", cache=True)(_greedy_order_loops)
+except ImportError:
+    _greedy_order = _greedy_order_numpy
+
+
+# Gemini rate limiting: concurrent calls, requests per rolling minute, retries on transient errors
+GEMINI_MAX_CONCURRENCY = int(os.environ.get("GEMINI_MAX_CONCURRENCY", "4"))
+GEMINI_MAX_RPM = int(os.environ.get("GEMINI_MAX_RPM", "15"))
+GEMINI_MAX_RETRIES = 3
+# Longest a request waits for a free slot in the per-minute budget before falling back
+GEMINI_MAX_THROTTLE_WAIT = float(os.environ.get("GEMINI_MAX_THROTTLE_WAIT", "3"))
+
+# Setlist style descriptions for the AI prompt
+_STYLE_DESC = {
+    "progressive": "gradually build energy from low to high, creating a journey",
+    "peak-time": "maintain high energy throughout with dramatic moments",
+    "chill": "keep energy low to medium, prioritizing smooth vibes",
+    "journey": "create a wave pattern - build up, peak, come down, build again"
 }
 
 
@@ -45,6 +167,9 @@ class DJService:
         self.api_key = os.environ.get("GEMINI_API_KEY")
         self._genai = None
         self._model = None
+        self._transient_errors: tuple = (asyncio.TimeoutError,)
+        self._ai_sem = asyncio.Semaphore(GEMINI_MAX_CONCURRENCY)
+        self._request_times: deque = deque()
     
     def _init_genai(self):
         """Lazy initialization of Gemini client."""
@@ -57,6 +182,14 @@ class DJService:
                 genai.configure(api_key=self.api_key)
                 self._genai = genai
                 self._model = genai.GenerativeModel('gemini-2.0-flash')
+                try:
+                    from google.api_core import exceptions as gexc
+                    self._transient_errors = (
+                        asyncio.TimeoutError, gexc.ResourceExhausted, gexc.ServiceUnavailable,
+                        gexc.DeadlineExceeded, gexc.InternalServerError
+                    )
+                except ImportError:
+                    pass
                 logger.info("Gemini 2.0 Flash initialized successfully")
                 return True
             except ImportError:
@@ -67,11 +200,42 @@ class DJService:
                 return False
         return True
     
+    async def _wait_if_throttled(self):
+        """
+        Wait until another request fits in the rolling one-minute window.
+        Raises instead if that takes longer than GEMINI_MAX_THROTTLE_WAIT, so callers
+        use their rule-based fallback rather than holding the HTTP request open.
+        """
+        while True:
+            now = time.monotonic()
+            while self._request_times and now - self._request_times[0] >= 60:
+                self._request_times.popleft()
+            if len(self._request_times) < GEMINI_MAX_RPM:
+                self._request_times.append(now)
+                return
+            wait = 60 - (now - self._request_times[0])
+            if wait > GEMINI_MAX_THROTTLE_WAIT:
+                raise RuntimeError(f"Gemini rate limit reached ({GEMINI_MAX_RPM}/min), next slot in {wait:.0f}s")
+            await asyncio.sleep(wait)
+    
+    async def _generate(self, prompt: str):
+        """Call Gemini with bounded concurrency, a per-minute budget, and backoff on transient errors."""
+        for attempt in range(GEMINI_MAX_RETRIES + 1):
+            await self._wait_if_throttled()
+            try:
+                async with self._ai_sem:
+                    return await self._model.generate_content_async(prompt)
+            except self._transient_errors as e:
+                if attempt == GEMINI_MAX_RETRIES:
+                    raise
+                delay = min(30, 2 ** attempt + random.random())
+                logger.warning(f"Gemini transient error ({type(e).__name__}), retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+    
     def is_harmonically_compatible(self, camelot1: str, camelot2: str) -> bool:
         """Check if two Camelot keys are harmonically compatible."""
-        if camelot1 == "?" or camelot2 == "?":
-            return False
-        return camelot2 in CAMELOT_COMPAT.get(camelot1, [])
+        # Unknown keys ("?") are never in the chart, so they're never compatible
+        return camelot2 in CAMELOT_COMPAT.get(camelot1, _NO_COMPAT)
     
     def _rule_based_setlist(self, tracks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
@@ -83,36 +247,18 @@ class DJService:
         
         # Start with lowest energy track
         sorted_tracks = sorted(tracks, key=lambda t: t.get("energy", 0.5))
-        setlist = [sorted_tracks.pop(0)]
         
-        while sorted_tracks:
-            last = setlist[-1]
-            last_camelot = last.get("camelot", "?")
-            last_bpm = last.get("bpm", 120)
-            
-            # Score remaining tracks by compatibility
-            def score_track(t):
-                score = 0
-                # Harmonic compatibility (+10 points)
-                if self.is_harmonically_compatible(last_camelot, t.get("camelot", "?")):
-                    score += 10
-                # BPM proximity (+5 for within 5 BPM, +3 for within 10)
-                bpm_diff = abs(t.get("bpm", 120) - last_bpm)
-                if bpm_diff <= 5:
-                    score += 5
-                elif bpm_diff <= 10:
-                    score += 3
-                # Slight energy increase preferred (+2)
-                energy_diff = t.get("energy", 0.5) - last.get("energy", 0.5)
-                if 0 < energy_diff < 0.15:
-                    score += 2
-                return score
-            
-            # Pick best scoring track
-            sorted_tracks.sort(key=score_track, reverse=True)
-            setlist.append(sorted_tracks.pop(0))
+        # Struct-of-arrays view of the tracks for vectorized scoring
+        bpm = np.array([t.get("bpm", 120) for t in sorted_tracks], dtype=np.float64)
+        energy = np.array([t.get("energy", 0.5) for t in sorted_tracks], dtype=np.float64)
+        cam_idx = np.array(
+            [_CAM_TO_INT.get(t.get("camelot", "?"), _UNKNOWN_CAM) for t in sorted_tracks],
+            dtype=np.intp
+        )
+        
+        order = _greedy_order(bpm, energy, cam_idx, _COMPAT_MATRIX)
         
-        return setlist
+        return [sorted_tracks[i] for i in order.tolist()]
     
     async def generate_setlist(
         self,
@@ -147,37 +293,38 @@ class DJService:
         
         # Fallback to rule-based
         logger.info("Using rule-based setlist generation")
-        ordered = self._rule_based_setlist(tracks.copy())
+        ordered = self._rule_based_setlist(tracks)
+        
+        ids = [t.get("id") for t in ordered]
+        
+        # Pairwise harmonic matches and BPM deltas for consecutive tracks, in bulk
+        cam_idx = np.fromiter(
+            (_CAM_TO_INT.get(t.get("camelot", "?"), _UNKNOWN_CAM) for t in ordered),
+            dtype=np.intp, count=len(ordered)
+        )
+        compat_arr = _COMPAT_MATRIX[cam_idx[:-1], cam_idx[1:]].tolist()
+        bpm_diff_arr = np.abs(np.diff(np.array([t.get("bpm", 0) for t in ordered]))).tolist()
         
         # Generate basic suggestions
         suggestions = []
-        for i in range(len(ordered) - 1):
-            t1, t2 = ordered[i], ordered[i+1]
-            bpm_diff = abs(t2.get("bpm", 0) - t1.get("bpm", 0))
-            compatible = self.is_harmonically_compatible(
-                t1.get("camelot", "?"), t2.get("camelot", "?")
+        for i, (compatible, bpm_diff) in enumerate(zip(compat_arr, bpm_diff_arr)):
+            tip = (
+                "Perfect mix - smooth harmonic transition" if compatible and bpm_diff <= 5
+                else f"Harmonically compatible, adjust BPM by {bpm_diff}" if compatible
+                else "BPM locked, consider EQ mixing" if bpm_diff <= 3
+                else "Energy transition - use effects or beat drop"
             )
             
-            suggestion = {
-                "from_id": t1.get("id"),
-                "to_id": t2.get("id"),
+            suggestions.append({
+                "from_id": ids[i],
+                "to_id": ids[i + 1],
                 "harmonic_match": compatible,
                 "bpm_diff": bpm_diff,
-            }
-            
-            if compatible and bpm_diff <= 5:
-                suggestion["tip"] = "Perfect mix - smooth harmonic transition"
-            elif compatible:
-                suggestion["tip"] = f"Harmonically compatible, adjust BPM by {bpm_diff}"
-            elif bpm_diff <= 3:
-                suggestion["tip"] = "BPM locked, consider EQ mixing"
-            else:
-                suggestion["tip"] = "Energy transition - use effects or beat drop"
-            
-            suggestions.append(suggestion)
+                "tip": tip,
+            })
         
         return {
-            "ordered_ids": [t.get("id") for t in ordered],
+            "ordered_ids": ids,
             "suggestions": suggestions,
             "method": "rule-based"
         }
@@ -188,27 +335,19 @@ class DJService:
         style: str
     ) -> Optional[Dict[str, Any]]:
         """Generate setlist using Gemini AI."""
-        import json
-        
         # Build track summary for the prompt
-        track_summary = []
-        for i, t in enumerate(tracks):
-            track_summary.append(
-                f"{i+1}. \"{t.get('name', 'Unknown')}\" by {t.get('artists', 'Unknown')} | "
-                f"BPM: {t.get('bpm', '?')} | Key: {t.get('camelot', '?')} | Energy: {t.get('energy', '?')}"
-            )
+        track_summary = "\n".join(
+            f"{i+1}. \"{t.get('name', 'Unknown')}\" by {t.get('artists', 'Unknown')} | "
+            f"BPM: {t.get('bpm', '?')} | Key: {t.get('camelot', '?')} | Energy: {t.get('energy', '?')}"
+            for i, t in enumerate(tracks)
+        )
         
-        style_desc = {
-            "progressive": "gradually build energy from low to high, creating a journey",
-            "peak-time": "maintain high energy throughout with dramatic moments",
-            "chill": "keep energy low to medium, prioritizing smooth vibes",
-            "journey": "create a wave pattern - build up, peak, come down, build again"
-        }.get(style, "gradually build energy")
+        style_desc = _STYLE_DESC.get(style, "gradually build energy")
         
         prompt = f"""You are an expert DJ creating an optimal setlist. Analyze these tracks and order them for the best flow.
 
 TRACKS:
-{chr(10).join(track_summary)}
+{track_summary}
 
 GOAL: {style_desc}
 
@@ -244,16 +383,13 @@ Respond ONLY with valid JSON in this exact format:
 }}"""
 
         try:
-            response = await self._model.generate_content_async(prompt)
+            response = await self._generate(prompt)
             text = response.text.strip()
             
-            # Extract JSON from response
-            if "```json" in text:
-                text = text.split("```json")[1].split("```")[0].strip()
-            elif "```" in text:
-                text = text.split("```")[1].split("```")[0].strip()
+            # Extract JSON
+            text = _extract_json(text)
             
-            data = json.loads(text)
+            data = _loads(text)
             order = data.get("order", [])
             tips = data.get("tips", [])
             
@@ -290,7 +426,7 @@ Respond ONLY with valid JSON in this exact format:
                 "method": "ai-gemini-2.0-flash"
             }
             
-        except json.JSONDecodeError as e:
+        except _json_fast.JSONDecodeError as e:
             logger.warning(f"Failed to parse AI response as JSON: {e}")
             return None
         except Exception as e:
@@ -326,21 +462,23 @@ Respond ONLY with valid JSON:
 }}"""
 
         try:
-            response = await self._model.generate_content_async(prompt)
+            response = await self._generate(prompt)
             text = response.text.strip()
             
             # Extract JSON
-            import json
-            if "```json" in text:
-                text = text.split("```json")[1].split("```")[0].strip()
-            elif "```" in text:
-                text = text.split("```")[1].split("```")[0].strip()
+            text = _extract_json(text)
+            
+            data = _loads(text)
             
-            data = json.loads(text)
+            # Stable across restarts (built-in hash() is randomized per process)
+            h = hashlib.blake2b(digest_size=8)
+            h.update(name.encode())
+            h.update(b"\x00")
+            h.update(artist.encode())
             
             # Validate
             return {
-                "track_id": f"ai_{abs(hash(name + artist))}", # Dummy ID
+                "track_id": f"ai_{h.hexdigest()}", # Dummy ID
                 "bpm": int(data.get("bpm", 120)),
                 "camelot": data.get("camelot", "?"),
                 "energy": float(data.get("energy", 0.5)),
@@ -383,17 +521,13 @@ Respond ONLY with valid JSON:
 }}"""
 
         try:
-            import json
-            response = await self._model.generate_content_async(prompt)
+            response = await self._generate(prompt)
             text = response.text.strip()
             
             # Extract JSON
-            if "```json" in text:
-                text = text.split("```json")[1].split("```")[0].strip()
-            elif "```" in text:
-                text = text.split("```")[1].split("```")[0].strip()
+            text = _extract_json(text)
             
-            data = json.loads(text)
+            data = _loads(text)
             logger.info(f"AI interpreted mood query: {query} -> {data.get('search_terms', [])}")
             return data
             
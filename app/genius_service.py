@@ -5,39 +5,213 @@ API docs: https://docs.genius.com/
 """
 import os
 import re
+import html
+import asyncio
+import time
+import hashlib
 import httpx
-from typing import Optional, Dict, Any
+import orjson
+from collections import OrderedDict
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional, Dict, Any, List, NamedTuple, Tuple
 import logging
-from bs4 import BeautifulSoup
+from app.http_client import PooledClientMixin
+from app.cache import get_cached_json, cache_json, SingleFlight
+
+if TYPE_CHECKING:
+    from bs4 import Tag
 
 logger = logging.getLogger(__name__)
 
+# Precompiled patterns for lyrics scraping / cleanup
+_MULTINL_RE = re.compile(r'\n{3,}')
+_LYRICS_CLASS_RE = re.compile(r'Lyrics__Container')
+_JSON_LYRICS_RE = re.compile(r'"lyrics":\s*\{[^}]*"plain":\s*"([^"]+)"')
+_LRC_TIMESTAMP_RE = re.compile(r'\[\d{2}:\d{2}\.\d{2,3}\]\s*')
+_LYRICS_BLOCK_RE = re.compile(r'<div[^>]*data-lyrics-container="true"[^>]*>(.*?)</div>', re.DOTALL)
+_BR_RE = re.compile(r'<br\s*/?>', re.I)
+_TAG_RE = re.compile(r'<[^>]+>')
+
+_LYRICS_FALLBACK_CLASS_RE = re.compile(r'Lyrics__Container|(?:^|\s)lyrics(?:\s|$)')
+
+
+class _SoupKit(NamedTuple):
+    """BeautifulSoup pieces for the DOM fallbacks."""
+    BeautifulSoup: type
+    Tag: type
+    lyrics_strainer: Any
+    fallback_strainer: Any
+    text_types: tuple
+
+
+@lru_cache(maxsize=1)
+def _soup_kit() -> _SoupKit:
+    """Import bs4 on first use - the regex fast path handles most pages without it."""
+    from bs4 import BeautifulSoup, SoupStrainer, Tag, NavigableString, CData
+    return _SoupKit(
+        BeautifulSoup=BeautifulSoup,
+        Tag=Tag,
+        # Only build the lyrics divs (and their children) instead of the whole page DOM
+        lyrics_strainer=SoupStrainer("div", attrs={"data-lyrics-container": "true"}),
+        fallback_strainer=SoupStrainer("div", class_=_LYRICS_FALLBACK_CLASS_RE),
+        # Strings get_text() includes (skips comments, doctypes, etc.)
+        text_types=(NavigableString, CData),
+    )
+
+
+def _extract_lyrics_fast(html_text: str) -> Optional[str]:
+    """
+    Pull lyrics out of data-lyrics-container blocks with regexes only.
+    Returns None when no block is found or a block has nested divs
+    (the non-greedy match would cut it short), so the caller can fall back to BeautifulSoup.
+    """
+    blocks = _LYRICS_BLOCK_RE.findall(html_text)
+    if not blocks or any("<div" in block for block in blocks):
+        return None
+    
+    parts = [html.unescape(_TAG_RE.sub("", _BR_RE.sub("\n", block))) for block in blocks]
+    lyrics = _MULTINL_RE.sub('\n\n', "\n".join(parts)).strip()
+    return lyrics or None
+
+
+# Lyrics and song metadata rarely change once published
+LYRICS_CACHE_TTL = 7 * 86400
+# Misses and matches without lyrics may be transient (e.g. a blocked scrape) - retry those sooner
+NO_LYRICS_CACHE_TTL = 6 * 3600
+# Cached marker for songs neither Genius nor LRCLIB know
+_MISS = "__miss__"
+# Page validators are kept longer than the lyrics are trusted, for conditional re-fetches
+PAGE_VALIDATOR_TTL = 30 * 86400
+# Use browser-like headers to avoid being blocked by Genius
+_BROWSER_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+_LRCLIB_HEADERS = {"User-Agent": "Freedify/1.1.8 (https://github.com/freedify)"}
+
+# Streamed page reads: chunk size, and how far past the last lyrics container to read
+STREAM_CHUNK_SIZE = 64 * 1024
+STREAM_TAIL_BYTES = 64 * 1024
+_LYRICS_MARKER_TEXT = 'data-lyrics-container="true"'
+_LYRICS_MARKER = _LYRICS_MARKER_TEXT.encode()
+# In-process LRU in front of Redis
+LRU_MAX_ENTRIES = 512
+
+
+def _cache_key(prefix: str, value: str) -> str:
+    """Short stable cache key for arbitrary text."""
+    return f"genius:{prefix}:" + hashlib.blake2b(value.encode(), digest_size=16).hexdigest()
+
+
+def _collect_text(node: "Tag", out: List[str], kit: _SoupKit):
+    """Append node text to out, emitting newlines for <br> (single walk, no tree mutation)."""
+    for child in node.children:
+        if type(child) in kit.text_types:
+            out.append(child)
+        elif isinstance(child, kit.Tag):
+            if child.name == "br":
+                out.append("\n")
+            else:
+                _collect_text(child, out, kit)
+
+
+def _container_text(node: "Tag") -> str:
+    """Text of a lyrics container with <br> as newlines."""
+    parts: List[str] = []
+    _collect_text(node, parts, _soup_kit())
+    return "".join(parts)
+
+
+def _normalize_query(artist: str, title: str) -> str:
+    """Lowercased, whitespace-collapsed "artist title" - the Genius search query and cache key."""
+    return " ".join(f"{artist or ''} {title or ''}".lower().split())
+
+
+def _name(item: Dict[str, Any]) -> Optional[str]:
+    """Name field of a Genius artist object."""
+    return item.get("name")
+
+
+def _empty_result(artist: str, title: str) -> Dict[str, Any]:
+    """Result shape for get_lyrics_and_info before anything is found."""
+    return {
+        "found": False,
+        "lyrics": None,
+        "title": title,
+        "artist": artist,
+        "about": None,
+        "album": None,
+        "release_date": None,
+        "producers": [],
+        "writers": [],
+        "annotations": [],
+        "genius_url": None,
+        "thumbnail": None,
+    }
+
 
-class GeniusService:
+async def _none() -> None:
+    """Placeholder awaitable for skipped lookups in gather()."""
+    return None
+
+
+class GeniusService(PooledClientMixin):
     """Service for fetching lyrics and annotations from Genius."""
     
     API_BASE = "https://api.genius.com"
     
-    def __init__(self):
+    def __init__(self, client: Optional[httpx.AsyncClient] = None, owns_client: bool = False):
         # Access token: use env var (required for production)
         self.access_token = os.environ.get("GENIUS_ACCESS_TOKEN", "")
         if not self.access_token:
             logger.warning("GENIUS_ACCESS_TOKEN not set - lyrics will not work")
-        self.client = httpx.AsyncClient(timeout=30.0)
+        self._auth_headers = {"Authorization": f"Bearer {self.access_token}"} if self.access_token else {}
+        self._bind_client(client, owns_client)
+        # L1 in-process LRU: key -> (expires_at, value). L2 is Redis (if configured).
+        self._lru: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        # Concurrent identical lookups share one pipeline run
+        self._inflight = SingleFlight()
+    
+    async def _get_cached(self, key: str) -> Optional[Any]:
+        """Look up a value in the in-process LRU, then Redis."""
+        entry = self._lru.get(key)
+        if entry:
+            if entry[0] > time.monotonic():
+                self._lru.move_to_end(key)
+                return entry[1]
+            del self._lru[key]
+        
+        cached = await get_cached_json(key)
+        if cached is not None:
+            # Redis holds the real expiry; re-check it at least every few hours
+            self._remember(key, cached, NO_LYRICS_CACHE_TTL)
+        return cached
+    
+    def _remember(self, key: str, value: Any, ttl: int):
+        """Store a value in the in-process LRU, evicting the oldest entries."""
+        self._lru[key] = (time.monotonic() + ttl, value)
+        self._lru.move_to_end(key)
+        while len(self._lru) > LRU_MAX_ENTRIES:
+            self._lru.popitem(last=False)
+    
+    async def _cache(self, key: str, value: Any, ttl: int):
+        """Store a value in both cache tiers."""
+        self._remember(key, value, ttl)
+        await cache_json(key, value, ttl)
     
     async def _api_request(self, endpoint: str, params: dict = None) -> dict:
         """Make authenticated API request to Genius."""
-        headers = {"Authorization": f"Bearer {self.access_token}"}
         if params is None:
             params = {}
         
         response = await self.client.get(
             f"{self.API_BASE}{endpoint}",
-            headers=headers,
+            headers=self._auth_headers,
             params=params
         )
         response.raise_for_status()
-        return response.json()
+        return orjson.loads(response.content)
     
     async def search_song(self, query: str) -> Optional[Dict[str, Any]]:
         """Search for a song on Genius. Returns the best match."""
@@ -86,94 +260,171 @@ class GeniusService:
                 "description": description_text,
                 "apple_music_id": song.get("apple_music_id"),
                 "recording_location": song.get("recording_location"),
-                "producer_artists": [p.get("name") for p in song.get("producer_artists", [])],
-                "writer_artists": [w.get("name") for w in song.get("writer_artists", [])],
-                "featured_artists": [f.get("name") for f in song.get("featured_artists", [])],
+                "producer_artists": list(map(_name, song.get("producer_artists") or ())),
+                "writer_artists": list(map(_name, song.get("writer_artists") or ())),
+                "featured_artists": list(map(_name, song.get("featured_artists") or ())),
             }
         except Exception as e:
             logger.error(f"Genius song details error: {e}")
             return None
     
     async def scrape_lyrics(self, genius_url: str) -> Optional[str]:
-        """Scrape lyrics from a Genius song page."""
+        """Scrape lyrics from a Genius song page (cached by URL, revalidated with ETag/Last-Modified)."""
+        key = _cache_key("page", genius_url)
+        cached = await self._get_cached(key)
+        if not isinstance(cached, dict):
+            cached = None
+        elif time.time() - cached["checked_at"] < LYRICS_CACHE_TTL:
+            return cached["lyrics"]
+        
+        async def load() -> Optional[str]:
+            page = await self._scrape_lyrics(genius_url, cached)
+            if page is None:
+                return None
+            await self._cache(key, page, PAGE_VALIDATOR_TTL)
+            return page["lyrics"]
+        
+        return await self._inflight.do(key, load)
+    
+    async def _scrape_lyrics(self, genius_url: str, cached: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """
+        Fetch a Genius song page and extract the lyrics.
+        Returns {lyrics, etag, last_modified, checked_at}; a 304 against the
+        cached validators reuses the cached lyrics without a download.
+        """
         try:
-            # Use browser-like headers to avoid being blocked by Genius
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-                "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-                "Accept-Language": "en-US,en;q=0.9",
-            }
+            headers = _BROWSER_HEADERS
+            if cached:
+                headers = dict(headers)  # Copy before adding this page's validators
+                if cached.get("etag"):
+                    headers["If-None-Match"] = cached["etag"]
+                if cached.get("last_modified"):
+                    headers["If-Modified-Since"] = cached["last_modified"]
             
-            response = await self.client.get(genius_url, follow_redirects=True, headers=headers)
-            
-            if response.status_code == 403:
-                logger.warning(f"Genius returned 403 for: {genius_url} - likely IP blocked")
-                return None
-            if response.status_code == 429:
-                logger.warning(f"Genius rate limited for: {genius_url}")
-                return None
+            async with self.client.stream("GET", genius_url, follow_redirects=True, headers=headers) as response:
+                if response.status_code == 304 and cached:
+                    logger.info(f"Genius page not modified, reusing cached lyrics: {genius_url}")
+                    return {**cached, "checked_at": time.time()}
+                if response.status_code == 403:
+                    logger.warning(f"Genius returned 403 for: {genius_url} - likely IP blocked")
+                    return None
+                if response.status_code == 429:
+                    logger.warning(f"Genius rate limited for: {genius_url}")
+                    return None
+                    
+                response.raise_for_status()
                 
-            response.raise_for_status()
+                html_text, lyrics = await self._read_lyrics_page(response)
             
-            html_text = response.text
             logger.info(f"Genius page fetched, size: {len(html_text)} bytes for {genius_url}")
             
-            soup = BeautifulSoup(html_text, "html.parser")
+            if not lyrics:
+                lyrics = self._extract_lyrics(html_text, genius_url)
+            if not lyrics:
+                return None
+            
+            return {
+                "lyrics": lyrics,
+                "etag": response.headers.get("etag"),
+                "last_modified": response.headers.get("last-modified"),
+                "checked_at": time.time(),
+            }
             
-            # Method 1: data-lyrics-container (current Genius format)
+        except Exception as e:
+            logger.error(f"Genius lyrics scrape error for {genius_url}: {e}")
+            return None
+    
+    async def _read_lyrics_page(self, response: httpx.Response) -> Tuple[str, Optional[str]]:
+        """
+        Read a streamed Genius page, stopping early once the lyrics containers are complete.
+        Returns (html_text, lyrics) - lyrics is None when the full page was read and
+        still needs the regular extraction.
+        """
+        encoding = response.charset_encoding or "utf-8"
+        buf = bytearray()
+        last_marker = -1
+        early_exit = True
+        
+        async for chunk in response.aiter_bytes(STREAM_CHUNK_SIZE):
+            buf.extend(chunk)
+            if not early_exit:
+                continue
+            
+            # Only search the newly received bytes (plus overlap for a split marker)
+            found = buf.rfind(_LYRICS_MARKER, max(0, len(buf) - len(chunk) - len(_LYRICS_MARKER)))
+            if found != -1:
+                last_marker = found
+            
+            # Lyrics containers are contiguous; well past the last one, assume they're all in
+            if last_marker != -1 and len(buf) - last_marker > STREAM_TAIL_BYTES:
+                html_text = buf.decode(encoding, errors="replace")
+                lyrics = _extract_lyrics_fast(html_text)
+                if lyrics:
+                    logger.info(f"Lyrics found via regex fast path after {len(buf)} bytes, skipping rest of page")
+                    return html_text, lyrics
+                # Fast path can't handle this page - the DOM fallbacks need all of it
+                early_exit = False
+        
+        return buf.decode(encoding, errors="replace"), None
+    
+    def _extract_lyrics(self, html_text: str, genius_url: str) -> Optional[str]:
+        """Extract lyrics from Genius page HTML, trying the cheapest method first."""
+        # Fast path: regex extraction without building a DOM
+        lyrics = _extract_lyrics_fast(html_text)
+        if lyrics:
+            logger.info(f"Lyrics found via regex fast path ({len(lyrics)} chars)")
+            return lyrics
+        
+        kit = _soup_kit()
+        
+        # Method 1: data-lyrics-container (current Genius format) - skip the parse if the page has none
+        if _LYRICS_MARKER_TEXT in html_text:
+            soup = kit.BeautifulSoup(html_text, "lxml", parse_only=kit.lyrics_strainer)
             lyrics_containers = soup.find_all("div", {"data-lyrics-container": "true"})
             
             if lyrics_containers:
-                lyrics_parts = []
-                for container in lyrics_containers:
-                    for br in container.find_all("br"):
-                        br.replace_with("\n")
-                    lyrics_parts.append(container.get_text())
-                
-                lyrics = "\n".join(lyrics_parts)
-                lyrics = re.sub(r'\n{3,}', '\n\n', lyrics)
+                lyrics = "\n".join(_container_text(container) for container in lyrics_containers)
+                lyrics = _MULTINL_RE.sub('\n\n', lyrics)
                 if lyrics.strip():
                     logger.info(f"Lyrics found via data-lyrics-container ({len(lyrics)} chars)")
                     return lyrics.strip()
-            
-            # Method 2: Lyrics__Container class (alternate Genius layout)
-            lyrics_containers_alt = soup.find_all("div", class_=re.compile(r"Lyrics__Container"))
-            if lyrics_containers_alt:
-                lyrics_parts = []
-                for container in lyrics_containers_alt:
-                    for br in container.find_all("br"):
-                        br.replace_with("\n")
-                    lyrics_parts.append(container.get_text())
-                
-                lyrics = "\n".join(lyrics_parts)
-                lyrics = re.sub(r'\n{3,}', '\n\n', lyrics)
-                if lyrics.strip():
-                    logger.info(f"Lyrics found via Lyrics__Container ({len(lyrics)} chars)")
-                    return lyrics.strip()
-            
-            # Method 3: older Genius format
-            lyrics_div = soup.find("div", class_="lyrics")
-            if lyrics_div:
-                text = lyrics_div.get_text().strip()
-                if text:
-                    logger.info(f"Lyrics found via .lyrics div ({len(text)} chars)")
-                    return text
-            
-            # Method 4: Try finding any div with [data-lyrics-container] in the raw HTML
-            # (in case BeautifulSoup parsing missed it)
-            import json
-            match = re.search(r'"lyrics":\s*\{[^}]*"plain":\s*"([^"]+)"', html_text)
-            if match:
-                lyrics = match.group(1).replace("\\n", "\n")
-                logger.info(f"Lyrics found via JSON extraction ({len(lyrics)} chars)")
-                return lyrics
-            
-            logger.warning(f"Could not find lyrics on page: {genius_url} (page size: {len(html_text)} bytes)")
-            return None
-            
-        except Exception as e:
-            logger.error(f"Genius lyrics scrape error for {genius_url}: {e}")
-            return None
+        
+        # Methods 2 & 3 share one parse and one walk over the strained divs
+        soup = kit.BeautifulSoup(html_text, "lxml", parse_only=kit.fallback_strainer)
+        lyrics_containers_alt = []
+        lyrics_div = None
+        for div in soup.find_all("div"):
+            classes = div.get("class") or ()
+            if any(_LYRICS_CLASS_RE.search(c) for c in classes):
+                lyrics_containers_alt.append(div)
+            elif lyrics_div is None and "lyrics" in classes:
+                lyrics_div = div
+        
+        # Method 2: Lyrics__Container class (alternate Genius layout)
+        if lyrics_containers_alt:
+            lyrics = "\n".join(_container_text(container) for container in lyrics_containers_alt)
+            lyrics = _MULTINL_RE.sub('\n\n', lyrics)
+            if lyrics.strip():
+                logger.info(f"Lyrics found via Lyrics__Container ({len(lyrics)} chars)")
+                return lyrics.strip()
+        
+        # Method 3: older Genius format
+        if lyrics_div:
+            text = lyrics_div.get_text().strip()
+            if text:
+                logger.info(f"Lyrics found via .lyrics div ({len(text)} chars)")
+                return text
+        
+        # Method 4: Try finding any div with [data-lyrics-container] in the raw HTML
+        # (in case BeautifulSoup parsing missed it)
+        match = _JSON_LYRICS_RE.search(html_text)
+        if match:
+            lyrics = match.group(1).replace("\\n", "\n")
+            logger.info(f"Lyrics found via JSON extraction ({len(lyrics)} chars)")
+            return lyrics
+        
+        logger.warning(f"Could not find lyrics on page: {genius_url} (page size: {len(html_text)} bytes)")
+        return None
     
     async def get_song_referents(self, song_id: int) -> list:
         """Get annotations for a song using the Genius API referents endpoint."""
@@ -219,34 +470,65 @@ class GeniusService:
             logger.error(f"Genius referents API error: {e}")
             return []
     
-    async def get_lyrics_and_info(self, artist: str, title: str) -> Dict[str, Any]:
+    async def get_lyrics_and_info(self, artist: str, title: str, genius_url: Optional[str] = None) -> Dict[str, Any]:
         """
         Main method: Search for a song, get lyrics and details.
         Returns a dict with lyrics, about info, annotations, and metadata.
+        Pass genius_url when the song page is already known to skip the search.
+        Results (including misses) are cached by (artist, title).
         """
-        result = {
-            "found": False,
-            "lyrics": None,
-            "title": title,
-            "artist": artist,
-            "about": None,
-            "album": None,
-            "release_date": None,
-            "producers": [],
-            "writers": [],
-            "annotations": [],
-            "genius_url": None,
-            "thumbnail": None,
-        }
+        query = _normalize_query(artist, title)
+        key = _cache_key("song", query)
+        cached = await self._get_cached(key)
+        if cached is not None:
+            if not cached.get(_MISS):
+                return cached
+            if not genius_url:
+                return _empty_result(artist, title)
         
-        # Search for the song on Genius (for metadata, annotations, URL)
-        query = f"{artist} {title}"
-        song = await self.search_song(query)
+        async def load() -> Dict[str, Any]:
+            result = await self._fetch_lyrics_and_info(artist, title, genius_url, query)
+            if genius_url:
+                # Partial result without song details - the page lyrics are cached by URL
+                return result
+            if result["found"]:
+                await self._cache(key, result, LYRICS_CACHE_TTL if result["lyrics"] else NO_LYRICS_CACHE_TTL)
+            else:
+                await self._cache(key, {_MISS: True}, NO_LYRICS_CACHE_TTL)
+            return result
+        
+        # URL lookups return a partial result, so they only coalesce with each other
+        return await self._inflight.do((key, genius_url), load)
+    
+    async def _fetch_lyrics_and_info(
+        self,
+        artist: str,
+        title: str,
+        genius_url: Optional[str] = None,
+        query: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Run the search / details / lyrics / annotations pipeline."""
+        query = query or _normalize_query(artist, title)
+        result = _empty_result(artist, title)
+        
+        # LRCLIB doesn't depend on the Genius match, so start it alongside the search
+        lrclib_task = asyncio.create_task(self.fetch_lyrics_lrclib(artist, title))
+        
+        if genius_url:
+            # Caller already resolved the song page (no id, so no details/annotations)
+            song = {"url": genius_url}
+        else:
+            # Search for the song on Genius (for metadata, annotations, URL)
+            try:
+                song = await self.search_song(query)
+            except BaseException:
+                lrclib_task.cancel()
+                raise
         
         if not song:
             logger.info(f"No Genius match for: {query}")
             # Still try LRCLIB for lyrics even without Genius match
-            lrclib_lyrics = await self.fetch_lyrics_lrclib(artist, title)
+            lrclib_lyrics = await lrclib_task
             if lrclib_lyrics:
                 result["found"] = True
                 result["lyrics"] = lrclib_lyrics
@@ -257,36 +539,47 @@ class GeniusService:
         result["thumbnail"] = song.get("thumbnail")
         result["title"] = song.get("title", title)
         result["artist"] = song.get("artist", artist)
-        
-        # Get detailed info from Genius API
         song_id = song.get("id")
-        if song_id:
-            details = await self.get_song_details(song_id)
-            if details:
-                result["about"] = details.get("description")
-                result["album"] = details.get("album")
-                result["release_date"] = details.get("release_date")
-                result["producers"] = details.get("producer_artists", [])
-                result["writers"] = details.get("writer_artists", [])
         
-        # Try LRCLIB first (reliable, no scraping needed)
-        lrclib_lyrics = await self.fetch_lyrics_lrclib(artist, title)
-        if lrclib_lyrics:
-            result["lyrics"] = lrclib_lyrics
-            logger.info(f"Lyrics fetched from LRCLIB for: {artist} - {title}")
-        else:
+        async def fetch_lyrics() -> Optional[str]:
+            # Try LRCLIB first (reliable, no scraping needed)
+            lrclib_lyrics = await lrclib_task
+            if lrclib_lyrics:
+                logger.info(f"Lyrics fetched from LRCLIB for: {artist} - {title}")
+                return lrclib_lyrics
+            
             # Fall back to Genius scraping
             if song.get("url"):
                 lyrics = await self.scrape_lyrics(song["url"])
-                result["lyrics"] = lyrics
                 if lyrics:
                     logger.info(f"Lyrics fetched from Genius scrape for: {artist} - {title}")
                 else:
                     logger.warning(f"No lyrics from either LRCLIB or Genius for: {artist} - {title}")
+                return lyrics
+            return None
+        
+        # Details, lyrics and annotations are independent - fetch them concurrently
+        details, lyrics, annotations = await asyncio.gather(
+            self.get_song_details(song_id) if song_id else _none(),
+            fetch_lyrics(),
+            self.get_song_referents(song_id) if song_id else _none(),
+            return_exceptions=True
+        )
+        
+        if isinstance(details, dict):
+            result["about"] = details.get("description")
+            result["album"] = details.get("album")
+            result["release_date"] = details.get("release_date")
+            result["producers"] = details.get("producer_artists", [])
+            result["writers"] = details.get("writer_artists", [])
+        
+        if isinstance(lyrics, str):
+            result["lyrics"] = lyrics
+        elif isinstance(lyrics, Exception):
+            logger.error(f"Lyrics fetch error for {artist} - {title}: {lyrics}")
         
         # Get annotations via Genius API (always works)
-        if song_id:
-            annotations = await self.get_song_referents(song_id)
+        if isinstance(annotations, list):
             result["annotations"] = annotations
         
         return result
@@ -301,7 +594,7 @@ class GeniusService:
             response = await self.client.get(
                 "https://lrclib.net/api/get",
                 params=params,
-                headers={"User-Agent": "Freedify/1.1.8 (https://github.com/freedify)"}
+                headers=_LRCLIB_HEADERS
             )
             
             if response.status_code == 404:
@@ -312,7 +605,7 @@ class GeniusService:
                 logger.warning(f"LRCLIB returned {response.status_code} for {artist} - {title}")
                 return None
             
-            data = response.json()
+            data = orjson.loads(response.content)
             
             # Prefer plain lyrics, fall back to synced
             plain = data.get("plainLyrics")
@@ -322,7 +615,7 @@ class GeniusService:
             synced = data.get("syncedLyrics")
             if synced and synced.strip():
                 # Strip timestamp tags [mm:ss.xx] from synced lyrics
-                clean = re.sub(r'\[\d{2}:\d{2}\.\d{2,3}\]\s*', '', synced)
+                clean = _LRC_TIMESTAMP_RE.sub('', synced)
                 return clean.strip()
             
             return None
@@ -331,9 +624,16 @@ class GeniusService:
             logger.error(f"LRCLIB error for {artist} - {title}: {e}")
             return None
     
-    async def close(self):
-        """Close the HTTP client."""
-        await self.client.aclose()
+    async def warm_up(self):
+        """Open a pooled connection to the Genius API and log the negotiated protocol."""
+        if not self.access_token:
+            return
+        try:
+            response = await self.client.head(self.API_BASE, headers=self._auth_headers)
+            logger.info(f"Genius API connection ready ({response.http_version})")
+        except Exception as e:
+            logger.debug(f"Genius warm-up failed: {e}")
+    
 
 
 # Singleton instance
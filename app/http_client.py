@@ -0,0 +1,74 @@
+"""
+Shared HTTP client for outbound API calls.
+One pooled httpx.AsyncClient (HTTP/2 enabled) reused across services.
+Set HTTP_BACKEND=aiohttp to run the same httpx API over aiohttp's connection pool.
+"""
+import os
+import httpx
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+HTTP_BACKEND = os.getenv("HTTP_BACKEND", "httpx").lower()
+
+_shared_client: Optional[httpx.AsyncClient] = None
+
+
+def build_client(**kwargs) -> httpx.AsyncClient:
+    """
+    Build a client with the shared pool settings for the configured backend.
+    Extra kwargs (e.g. cookies, headers) are passed through to the client.
+    """
+    if HTTP_BACKEND == "aiohttp":
+        try:
+            from httpx_aiohttp import HttpxAiohttpClient
+            logger.info("HTTP client using aiohttp transport")
+            # aiohttp speaks HTTP/1.1 only and manages its own pool
+            return HttpxAiohttpClient(timeout=30.0, follow_redirects=True, **kwargs)
+        except ImportError:
+            logger.warning("httpx-aiohttp not installed - falling back to the httpx transport")
+    
+    return httpx.AsyncClient(
+        http2=True,
+        timeout=30.0,
+        follow_redirects=True,
+        # Keep idle connections for a minute so bursts of stream/API calls reuse TLS sessions
+        limits=httpx.Limits(max_connections=1000, max_keepalive_connections=200, keepalive_expiry=60.0),
+        **kwargs,
+    )
+
+
+def get_shared_client() -> httpx.AsyncClient:
+    """Get (lazily creating) the process-wide pooled HTTP client."""
+    global _shared_client
+    if _shared_client is None or _shared_client.is_closed:
+        _shared_client = build_client()
+    return _shared_client
+
+
+async def close_shared_client():
+    """Close the shared client (called on app shutdown)."""
+    global _shared_client
+    if _shared_client is not None:
+        await _shared_client.aclose()
+        _shared_client = None
+
+
+class PooledClientMixin:
+    """
+    Binds a service to an HTTP client. Without an injected client the service
+    uses the shared pool; an injected client belongs to the caller and is only
+    closed by the service when it is passed with owns_client=True.
+    """
+    client: httpx.AsyncClient
+    _owns_client: bool = False
+    
+    def _bind_client(self, client: Optional[httpx.AsyncClient] = None, owns_client: bool = False):
+        self.client = client or get_shared_client()
+        self._owns_client = client is not None and owns_client
+    
+    async def close(self):
+        """Close the HTTP client if this service owns it (the shared client is closed on app shutdown)."""
+        if self._owns_client:
+            await self.client.aclose()
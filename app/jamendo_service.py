@@ -48,7 +48,7 @@ class JamendoService:
     async def get_track(self, track_id: str) -> Optional[Dict[str, Any]]:
         """Get single track details."""
         try:
-            clean_id = track_id.replace("jm_", "")
+            clean_id = track_id.removeprefix("jm_")
             data = await self._api_request("/tracks/", {
                 "id": clean_id,
                 "include": "musicinfo licenses",
@@ -102,7 +102,7 @@ class JamendoService:
     async def get_album(self, album_id: str) -> Optional[Dict[str, Any]]:
         """Get album with all tracks."""
         try:
-            clean_id = album_id.replace("jm_", "")
+            clean_id = album_id.removeprefix("jm_")
             
             # Get album info
             album_data = await self._api_request("/albums/", {"id": clean_id})
@@ -162,7 +162,7 @@ class JamendoService:
     async def get_artist(self, artist_id: str) -> Optional[Dict[str, Any]]:
         """Get artist info with top tracks."""
         try:
-            clean_id = artist_id.replace("jm_artist_", "").replace("jm_", "")
+            clean_id = artist_id.removeprefix("jm_artist_").removeprefix("jm_")
             
             # Get artist info
             artist_data = await self._api_request("/artists/", {"id": clean_id})
@@ -208,7 +208,7 @@ class JamendoService:
     async def get_stream_url(self, track_id: str, prefer_flac: bool = True) -> Optional[str]:
         """Get direct stream URL for a track. Tries FLAC first, falls back to MP3."""
         try:
-            clean_id = track_id.replace("jm_", "")
+            clean_id = track_id.removeprefix("jm_")
             
             # Try FLAC first
             if prefer_flac:
@@ -4,29 +4,76 @@ Handles scrobbling (listening history) and personalized recommendations.
 """
 import os
 import time
+import asyncio
 import httpx
+import orjson
 from typing import Optional, Dict, List, Any
 import logging
 from app.musicbrainz_service import musicbrainz_service
+from app.http_client import PooledClientMixin
 
 logger = logging.getLogger(__name__)
 
 # User token from environment (can also be set via frontend settings)
 LISTENBRAINZ_TOKEN = os.getenv("LISTENBRAINZ_TOKEN")
 
+# Internal track ids that look like ISRCs but must not be sent as one
+_SYNTHETIC_ISRC_PREFIXES = ("dz_", "ytm_", "LINK:", "pod_")
 
-class ListenBrainzService:
+# Optional track fields sent as additional_info: (track key, ListenBrainz key)
+_ADDITIONAL_INFO_FIELDS = (
+    ("duration_ms", "duration_ms"),
+    ("album", "release_name"),
+    ("track_number", "tracknumber"),
+)
+
+# Max concurrent MusicBrainz lookups when resolving recommendations
+MB_LOOKUP_CONCURRENCY = 5
+
+# Background scrobbling: listens are batched for up to this many items / seconds
+SCROBBLE_BATCH_SIZE = 10
+SCROBBLE_BATCH_WINDOW = 1.0
+# How long shutdown waits for queued listens to be submitted
+SCROBBLE_FLUSH_TIMEOUT = 5.0
+
+
+def _format_listen(listen: Dict[str, Any]) -> Dict[str, Any]:
+    """Flatten a ListenBrainz listen for the frontend."""
+    metadata = listen.get("track_metadata", {})
+    return {
+        "track_name": metadata.get("track_name"),
+        "artist_name": metadata.get("artist_name"),
+        "listened_at": listen.get("listened_at"),
+        "source": "listenbrainz"
+    }
+
+
+class ListenBrainzService(PooledClientMixin):
     """Service for ListenBrainz scrobbling and recommendations."""
     
     API_BASE = "https://api.listenbrainz.org"
+    TIMEOUT = 15.0
     
-    def __init__(self):
-        self.token = LISTENBRAINZ_TOKEN
-        self.client = httpx.AsyncClient(timeout=15.0)
+    def __init__(self, client: Optional[httpx.AsyncClient] = None, owns_client: bool = False):
+        self.set_token(LISTENBRAINZ_TOKEN)
+        self._bind_client(client, owns_client)
+        # Scrobble queue + worker, created by start() (direct submits until then)
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+    
+    def start(self):
+        """Start the background scrobble worker (called on app startup)."""
+        if self._worker is None:
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._scrobble_worker())
     
     def set_token(self, token: str):
         """Set user token (from settings UI)."""
         self.token = token
+        self._auth_headers = {
+            "Authorization": f"Token {token}",
+            "Content-Type": "application/json"
+        }
     
     def is_configured(self) -> bool:
         """Check if ListenBrainz token is configured."""
@@ -34,10 +81,7 @@ class ListenBrainzService:
     
     def _get_headers(self) -> dict:
         """Get headers with authorization."""
-        return {
-            "Authorization": f"Token {self.token}",
-            "Content-Type": "application/json"
-        }
+        return self._auth_headers
     
     async def submit_now_playing(self, track: Dict[str, Any]) -> bool:
         """Submit 'now playing' status when a track starts.
@@ -58,7 +102,8 @@ class ListenBrainzService:
             response = await self.client.post(
                 f"{self.API_BASE}/1/submit-listens",
                 headers=self._get_headers(),
-                json=payload
+                content=orjson.dumps(payload),
+                timeout=self.TIMEOUT
             )
             
             if response.status_code == 200:
@@ -76,6 +121,7 @@ class ListenBrainzService:
         """Submit a completed listen (scrobble).
         
         Should be called after user listens to 50% of track or 4 minutes, whichever is shorter.
+        Once start() has run, listens are queued and submitted in batches in the background.
         
         Args:
             track: Track info with name, artists, album, duration_ms
@@ -87,21 +133,37 @@ class ListenBrainzService:
         
         try:
             track_payload = self._format_track_payload(track)
-            track_payload["listened_at"] = listened_at or int(time.time())
-            
+        except Exception as e:
+            logger.error(f"ListenBrainz scrobble error: {e}")
+            return False
+        track_payload["listened_at"] = listened_at or int(time.time())
+        
+        # Hand off to the background worker so the caller doesn't wait on ListenBrainz
+        if self._queue is not None:
+            self._queue.put_nowait(track_payload)
+            logger.debug(f"ListenBrainz scrobble queued: {track.get('name')}")
+            return True
+        
+        return await self._post_listens([track_payload])
+    
+    async def _post_listens(self, listens: List[Dict[str, Any]]) -> bool:
+        """Submit one or more completed listens in a single request."""
+        try:
             payload = {
-                "listen_type": "single",
-                "payload": [track_payload]
+                "listen_type": "single" if len(listens) == 1 else "import",
+                "payload": listens
             }
             
             response = await self.client.post(
                 f"{self.API_BASE}/1/submit-listens",
                 headers=self._get_headers(),
-                json=payload
+                content=orjson.dumps(payload),
+                timeout=self.TIMEOUT
             )
             
             if response.status_code == 200:
-                logger.info(f"ListenBrainz scrobbled: {track.get('name')}")
+                names = ", ".join(l["track_metadata"]["track_name"] for l in listens)
+                logger.info(f"ListenBrainz scrobbled: {names}")
                 return True
             else:
                 logger.warning(f"ListenBrainz scrobble failed: {response.status_code} - {response.text}")
@@ -111,6 +173,27 @@ class ListenBrainzService:
             logger.error(f"ListenBrainz scrobble error: {e}")
             return False
     
+    async def _scrobble_worker(self):
+        """Drain the scrobble queue, batching listens that arrive close together."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + SCROBBLE_BATCH_WINDOW
+            while len(batch) < SCROBBLE_BATCH_SIZE:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            try:
+                await self._post_listens(batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+    
     def _format_track_payload(self, track: Dict[str, Any]) -> dict:
         """Format track data for ListenBrainz API."""
         # Get artist name (handle both string and list formats)
@@ -120,22 +203,16 @@ class ListenBrainzService:
         
         additional_info = {}
         
-        # Add duration if available
-        duration_ms = track.get("duration_ms")
-        if duration_ms:
-            additional_info["duration_ms"] = duration_ms
-        
-        # Add release name (album)
-        if track.get("album"):
-            additional_info["release_name"] = track["album"]
+        # Add duration, release name (album) and track number if available
+        for src, dst in _ADDITIONAL_INFO_FIELDS:
+            value = track.get(src)
+            if value:
+                additional_info[dst] = value
         
         # Add ISRC if available (helps with MusicBrainz matching)
-        if track.get("isrc") and not track["isrc"].startswith(("dz_", "ytm_", "LINK:", "pod_")):
-            additional_info["isrc"] = track["isrc"]
-        
-        # Add track number if available
-        if track.get("track_number"):
-            additional_info["tracknumber"] = track["track_number"]
+        isrc = track.get("isrc")
+        if isrc and not isrc.startswith(_SYNTHETIC_ISRC_PREFIXES):
+            additional_info["isrc"] = isrc
         
         return {
             "track_metadata": {
@@ -157,27 +234,32 @@ class ListenBrainzService:
         try:
             response = await self.client.get(
                 f"{self.API_BASE}/1/cf/recommendation/recording/{username}",
-                params={"count": count}
+                params={"count": count},
+                timeout=self.TIMEOUT
             )
             
             if response.status_code != 200:
                 logger.warning(f"ListenBrainz recommendations failed: {response.status_code}")
                 return []
             
-            data = response.json()
+            data = orjson.loads(response.content)
             payload = data.get("payload", {})
             
-            recommendations = []
             mbids = [rec.get("recording_mbid") for rec in payload.get("mbids", [])[:15]] # Limit to 15 for performance
             
-            for mbid in mbids:
-                if not mbid: continue
-                # Lookup metadata from MusicBrainz
-                track_data = await musicbrainz_service.lookup_recording(mbid)
-                if track_data:
-                    track_data["type"] = "recommendation"
-                    track_data["source"] = "listenbrainz"
-                    recommendations.append(track_data)
+            # Lookup metadata from MusicBrainz concurrently (bounded to stay polite)
+            sem = asyncio.Semaphore(MB_LOOKUP_CONCURRENCY)
+            
+            async def lookup(mbid: str) -> Optional[Dict[str, Any]]:
+                async with sem:
+                    return await musicbrainz_service.lookup_recording(mbid)
+            
+            results = await asyncio.gather(*(lookup(mbid) for mbid in mbids if mbid))
+            
+            recommendations = [track_data for track_data in results if track_data]
+            for track_data in recommendations:
+                track_data["type"] = "recommendation"
+                track_data["source"] = "listenbrainz"
             
             return recommendations
             
@@ -190,21 +272,17 @@ class ListenBrainzService:
         try:
             response = await self.client.get(
                 f"{self.API_BASE}/1/user/{username}/listens",
-                params={"count": count}
+                params={"count": count},
+                timeout=self.TIMEOUT
             )
             
             if response.status_code != 200:
                 return []
             
-            data = response.json()
+            data = orjson.loads(response.content)
             listens = data.get("payload", {}).get("listens", [])
             
-            return [{
-                "track_name": l.get("track_metadata", {}).get("track_name"),
-                "artist_name": l.get("track_metadata", {}).get("artist_name"),
-                "listened_at": l.get("listened_at"),
-                "source": "listenbrainz"
-            } for l in listens]
+            return list(map(_format_listen, listens))
             
         except Exception as e:
             logger.error(f"ListenBrainz get listens error: {e}")
@@ -218,11 +296,12 @@ class ListenBrainzService:
         try:
             response = await self.client.get(
                 f"{self.API_BASE}/1/validate-token",
-                headers=self._get_headers()
+                headers=self._get_headers(),
+                timeout=self.TIMEOUT
             )
             
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 if data.get("valid"):
                     return data.get("user_name")
             
@@ -232,40 +311,34 @@ class ListenBrainzService:
             logger.error(f"ListenBrainz token validation error: {e}")
             return None
     
-    async def get_user_playlists(self, username: str, count: int = 25) -> List[Dict[str, Any]]:
-        """Get user's playlists from ListenBrainz (includes Weekly Exploration)."""
-        formatted = []
-        
-        # Fetch user-created playlists
-        try:
-            response = await self.client.get(
-                f"{self.API_BASE}/1/user/{username}/playlists",
-                params={"count": count}
-            )
-            
-            if response.status_code == 200:
-                data = response.json()
-                playlists = data.get("playlists", [])
-                formatted.extend(self._format_playlists(playlists, username))
-        except Exception as e:
-            logger.error(f"ListenBrainz user playlists error: {e}")
-        
-        # Fetch "created-for" playlists (Weekly Exploration, Daily Jam, etc.)
+    async def _fetch_playlists(self, path: str, username: str, count: int, is_generated: bool = False) -> List[Dict[str, Any]]:
+        """Fetch and format one ListenBrainz playlist listing."""
         try:
             response = await self.client.get(
-                f"{self.API_BASE}/1/user/{username}/playlists/createdfor",
-                params={"count": count}
+                f"{self.API_BASE}/1/user/{username}/{path}",
+                params={"count": count},
+                timeout=self.TIMEOUT
             )
             
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 playlists = data.get("playlists", [])
-                # Add these at the beginning since they're the most interesting
-                formatted = self._format_playlists(playlists, username, is_generated=True) + formatted
+                return self._format_playlists(playlists, username, is_generated=is_generated)
         except Exception as e:
-            logger.error(f"ListenBrainz created-for playlists error: {e}")
+            label = "created-for" if is_generated else "user"
+            logger.error(f"ListenBrainz {label} playlists error: {e}")
+        return []
+    
+    async def get_user_playlists(self, username: str, count: int = 25) -> List[Dict[str, Any]]:
+        """Get user's playlists from ListenBrainz (includes Weekly Exploration)."""
+        # User-created and "created-for" playlists (Weekly Exploration, Daily Jam, etc.) in parallel
+        created, generated = await asyncio.gather(
+            self._fetch_playlists("playlists", username, count),
+            self._fetch_playlists("playlists/createdfor", username, count, is_generated=True)
+        )
         
-        return formatted
+        # Generated ones go first since they're the most interesting
+        return generated + created
 
     async def get_user_stats(self, username: str) -> Dict[str, Any]:
         """Get user's listening statistics from ListenBrainz."""
@@ -279,10 +352,11 @@ class ListenBrainzService:
         try:
             # Get total listen count
             response = await self.client.get(
-                f"{self.API_BASE}/1/user/{username}/listen-count"
+                f"{self.API_BASE}/1/user/{username}/listen-count",
+                timeout=self.TIMEOUT
             )
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 stats["listen_count"] = data.get("payload", {}).get("count", 0)
         except Exception as e:
             logger.warning(f"ListenBrainz listen count error: {e}")
@@ -292,12 +366,13 @@ class ListenBrainzService:
             for time_range in ["this_week", "all_time"]:
                 response = await self.client.get(
                     f"{self.API_BASE}/1/stats/user/{username}/artists",
-                    params={"count": 5, "range": time_range}
+                    params={"count": 5, "range": time_range},
+                    timeout=self.TIMEOUT
                 )
                 logger.info(f"LB stats for {username} ({time_range}): {response.status_code}")
                 
                 if response.status_code == 200:
-                    data = response.json()
+                    data = orjson.loads(response.content)
                     artists = data.get("payload", {}).get("artists", [])
                     if artists:
                         stats["top_artists"] = [
@@ -346,17 +421,18 @@ class ListenBrainzService:
         """Get tracks from a ListenBrainz playlist."""
         try:
             # Remove lb_ prefix if present
-            clean_id = playlist_id.replace("lb_", "")
+            clean_id = playlist_id.removeprefix("lb_")
             
             response = await self.client.get(
-                f"{self.API_BASE}/1/playlist/{clean_id}"
+                f"{self.API_BASE}/1/playlist/{clean_id}",
+                timeout=self.TIMEOUT
             )
             
             if response.status_code != 200:
                 logger.warning(f"ListenBrainz playlist fetch failed: {response.status_code}")
                 return None
             
-            data = response.json()
+            data = orjson.loads(response.content)
             playlist = data.get("playlist", {})
             
             # Parse JSPF tracks
@@ -401,8 +477,16 @@ class ListenBrainzService:
             return None
     
     async def close(self):
-        """Close the HTTP client."""
-        await self.client.aclose()
+        """Flush queued scrobbles, then close the HTTP client if owned."""
+        if self._worker is not None:
+            try:
+                await asyncio.wait_for(self._queue.join(), SCROBBLE_FLUSH_TIMEOUT)
+            except asyncio.TimeoutError:
+                logger.warning(f"ListenBrainz: {self._queue.qsize()} scrobbles not submitted before shutdown")
+            self._worker.cancel()
+            self._worker = None
+            self._queue = None
+        await super().close()
 
 
 # Singleton instance
@@ -4,9 +4,13 @@ Searches Phish.in for Phish shows and Archive.org for other jam bands.
 """
 import httpx
 import re
-from typing import Optional, Dict, List, Any
+import time
+from typing import Optional, Dict, List, Any, Tuple, Callable
 import logging
 
+from app.cache import SingleFlight
+from app.http_client import PooledClientMixin
+
 logger = logging.getLogger(__name__)
 
 
@@ -23,15 +27,93 @@ ARCHIVE_BANDS = {
     "kglw": "KingGizzardAndTheLizardWizard",
 }
 
+# Archive.org collection -> display name
+ARCHIVE_DISPLAY_NAMES = {
+    "GratefulDead": "Grateful Dead",
+    "BillyStrings": "Billy Strings",
+    "Ween": "Ween",
+    "KingGizzardAndTheLizardWizard": "King Gizzard & The Lizard Wizard",
+}
+
+# Bands with a live-show source (Phish.in for Phish, Archive.org for the rest), longest first.
+# A tuple so the same object drives both the C-level str.startswith pre-check and the regex.
+_LIVE_BANDS: Tuple[str, ...] = tuple(sorted(ARCHIVE_BANDS.keys() | {"phish"}, key=len, reverse=True))
+
+# Cheap pre-check so non-live searches skip the full pattern
+_HAS_YEAR_RE = re.compile(r'\d{4}')
+
+# Pattern: band name + year or year/month (any "king gizzard ..." spelling is accepted)
+# e.g., "Phish 2025", "Grateful Dead 1977/05", "Billy Strings 2023-08"
+_LIVE_SEARCH_RE = re.compile(
+    r'^(' + "|".join(map(re.escape, _LIVE_BANDS)) + r'|king gizzard.*?)\s+(\d{4})(?:[/-](\d{1,2}))?$'
+)
+
+# Show listings for a year rarely change; keep raw listings in-process for an hour
+LISTING_CACHE_TTL = 3600
+LISTING_CACHE_MAX_ENTRIES = 256
 
-class LiveShowService:
+
+class LiveShowService(PooledClientMixin):
     """Service for searching live show archives."""
     
     PHISH_API = "https://phish.in/api/v2"
     ARCHIVE_API = "https://archive.org/advancedsearch.php"
+    TIMEOUT = 30.0
+    HEADERS = {"User-Agent": "Freedify/1.0"}
+    
+    def __init__(self, client: Optional[httpx.AsyncClient] = None, owns_client: bool = False):
+        # Shared pooled HTTP/2 client: concurrent searches multiplex over one connection per host
+        self._bind_client(client, owns_client)
+        # Raw upstream listings: key -> (expires_at, etag, last_modified, shows/docs).
+        # Expired entries are kept so their validators can revalidate them.
+        self._cache: Dict[Tuple, Tuple[float, Optional[str], Optional[str], List[Dict[str, Any]]]] = {}
+        # Concurrent identical live-show searches share one upstream request
+        self._inflight = SingleFlight()
+    
+    def _cache_listing(
+        self, key: Tuple, listing: List[Dict[str, Any]], etag: Optional[str], last_modified: Optional[str]
+    ):
+        """Store a listing, dropping expired entries once the cache is full."""
+        now = time.monotonic()
+        if len(self._cache) >= LISTING_CACHE_MAX_ENTRIES:
+            self._cache = {k: v for k, v in self._cache.items() if v[0] > now}
+        self._cache[key] = (now + LISTING_CACHE_TTL, etag, last_modified, listing)
     
-    def __init__(self):
-        self.client = httpx.AsyncClient(timeout=30.0)
+    async def _get_listing(
+        self,
+        key: Tuple,
+        url: str,
+        params: Dict[str, Any],
+        extract: Callable[[Dict[str, Any]], List[Dict[str, Any]]],
+        source: str,
+    ) -> Optional[List[Dict[str, Any]]]:
+        """
+        Fetch a raw listing through the cache. Stale entries are revalidated with
+        If-None-Match / If-Modified-Since so an unchanged listing costs a bodiless 304.
+        Returns None on upstream errors.
+        """
+        entry = self._cache.get(key)
+        if entry and entry[0] > time.monotonic():
+            return entry[3]
+        
+        headers = dict(self.HEADERS)
+        if entry:
+            if entry[1]:
+                headers["If-None-Match"] = entry[1]
+            if entry[2]:
+                headers["If-Modified-Since"] = entry[2]
+        
+        response = await self.client.get(url, params=params, headers=headers, timeout=self.TIMEOUT)
+        if response.status_code == 304 and entry:
+            self._cache_listing(key, entry[3], entry[1], entry[2])
+            return entry[3]
+        if response.status_code != 200:
+            logger.warning(f"{source} API returned {response.status_code}")
+            return None
+        
+        listing = extract(response.json())
+        self._cache_listing(key, listing, response.headers.get("etag"), response.headers.get("last-modified"))
+        return listing
     
     def detect_live_search(self, query: str) -> Optional[Dict[str, Any]]:
         """
@@ -44,14 +126,14 @@ class LiveShowService:
         - "Grateful Dead 1977" -> {"band": "grateful dead", "year": "1977", "month": None}
         """
         query_lower = query.lower().strip()
+        if not query_lower.startswith(_LIVE_BANDS) or not _HAS_YEAR_RE.search(query_lower):
+            return None
         
-        # Pattern: band name + year or year/month
-        # e.g., "Phish 2025", "Grateful Dead 1977/05", "Billy Strings 2023-08"
-        pattern = r'^(phish|grateful dead|dead|gd|billy strings|ween|king gizzard.*?|kglw)\s+(\d{4})(?:[/-](\d{1,2}))?$'
-        
-        match = re.match(pattern, query_lower)
+        match = _LIVE_SEARCH_RE.match(query_lower)
         if match:
             band = match.group(1)
+            if band != "phish" and band not in ARCHIVE_BANDS:
+                band = "king gizzard"  # Lenient "king gizzard ..." spelling
             year = match.group(2)
             month = match.group(3)
             return {
@@ -64,18 +146,18 @@ class LiveShowService:
     async def search_phish_shows(self, year: str, month: str = None) -> List[Dict[str, Any]]:
         """Search Phish.in for shows by year/month."""
         try:
-            # Phish.in API endpoint for shows by year
-            url = f"{self.PHISH_API}/shows"
-            params = {"year": year}
-            
-            response = await self.client.get(url, params=params)
-            if response.status_code != 200:
-                logger.warning(f"Phish.in API returned {response.status_code}")
-                return []
-            
-            data = response.json()
+            # Phish.in API endpoint for shows by year; the whole-year listing is cached
+            # and month filtering happens locally.
             # API v2 returns {'data': [...]} or {'shows': [...]} (observed 'shows' in testing)
-            shows = data.get('data', []) or data.get('shows', [])
+            shows = await self._get_listing(
+                ("phish", year),
+                f"{self.PHISH_API}/shows",
+                {"year": year},
+                lambda data: data.get('data', []) or data.get('shows', []),
+                "Phish.in",
+            )
+            if shows is None:
+                return []
             
             # Filter by month if specified
             if month:
@@ -110,14 +192,8 @@ class LiveShowService:
     async def search_archive_shows(self, band: str, year: str, month: str = None) -> List[Dict[str, Any]]:
         """Search Archive.org Live Music Archive for shows."""
         try:
-            # Get the Archive.org collection name
-            band_lower = band.lower()
-            collection = None
-            for key, val in ARCHIVE_BANDS.items():
-                if key in band_lower or band_lower in key:
-                    collection = val
-                    break
-            
+            # Get the Archive.org collection name (detect_live_search yields exact keys)
+            collection = ARCHIVE_BANDS.get(band.lower())
             if not collection:
                 return []
             
@@ -133,22 +209,17 @@ class LiveShowService:
                 "output": "json",
             }
             
-            response = await self.client.get(self.ARCHIVE_API, params=params)
-            if response.status_code != 200:
-                logger.warning(f"Archive.org API returned {response.status_code}")
+            docs = await self._get_listing(
+                (collection, year, month),
+                self.ARCHIVE_API,
+                params,
+                lambda data: data.get("response", {}).get("docs", []),
+                "Archive.org",
+            )
+            if docs is None:
                 return []
             
-            data = response.json()
-            docs = data.get("response", {}).get("docs", [])
-            
-            # Map band collection to display name
-            band_names = {
-                "GratefulDead": "Grateful Dead",
-                "BillyStrings": "Billy Strings",
-                "Ween": "Ween",
-                "KingGizzardAndTheLizardWizard": "King Gizzard & The Lizard Wizard",
-            }
-            display_name = band_names.get(collection, collection)
+            display_name = ARCHIVE_DISPLAY_NAMES.get(collection, collection)
             
             results = []
             for doc in docs:
@@ -191,15 +262,16 @@ class LiveShowService:
         # Phish -> use phish.in
         if band == "phish":
             logger.info(f"Searching Phish.in for {year}" + (f"/{month}" if month else ""))
-            return await self.search_phish_shows(year, month)
+            return await self._inflight.do(
+                ("phish", year, month), lambda: self.search_phish_shows(year, month)
+            )
         
-        # Other bands -> use Archive.org
+        # Other bands -> use Archive.org (aliases of one band share a key)
         logger.info(f"Searching Archive.org for {band} {year}" + (f"/{month}" if month else ""))
-        return await self.search_archive_shows(band, year, month)
+        return await self._inflight.do(
+            (ARCHIVE_BANDS.get(band, band), year, month), lambda: self.search_archive_shows(band, year, month)
+        )
     
-    async def close(self):
-        """Close the HTTP client."""
-        await self.client.aclose()
 
 
 # Singleton instance
@@ -3,26 +3,33 @@ Freedify Streaming Server
 A FastAPI server for streaming music with FFmpeg transcoding.
 """
 import os
+import re
 import asyncio
+import base64
+import functools
 import logging
 from contextlib import asynccontextmanager
-from typing import Optional
+from typing import Callable, Optional, Tuple, Union
 
 from fastapi import FastAPI, HTTPException, Query, Response, Request
+from fastapi.exceptions import RequestValidationError
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, StreamingResponse
+from fastapi.responses import FileResponse, StreamingResponse, ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.middleware.gzip import GZipMiddleware
+from pydantic import BaseModel, ValidationError
 import zipfile
 import io
 from typing import List
 import httpx
+import msgspec
+import orjson
 
 
 from app.deezer_service import deezer_service
 from app.live_show_service import live_show_service
-from app.spotify_service import spotify_service
-from app.audio_service import audio_service
+from app.spotify_service import spotify_service, is_spotify_id
+from app.audio_service import audio_service, direct_audio_mime
 from app.podcast_service import podcast_service
 from app.dj_service import dj_service
 from app.ai_radio_service import ai_radio_service
@@ -33,7 +40,11 @@ from app.jamendo_service import jamendo_service
 from app.genius_service import genius_service
 from app.concert_service import concert_service
 
-from app.cache import cleanup_cache, periodic_cleanup, is_cached, get_cache_path
+from app.cache import (
+    cleanup_cache, periodic_cleanup, is_cached, get_cache_path, cache_file,
+    get_cached_raw, cache_json, get_cached_json_many, cache_json_many, SingleFlight,
+)
+from app.http_client import close_shared_client, get_shared_client
 
 # Configure logging
 logging.basicConfig(
@@ -54,22 +65,44 @@ async def lifespan(app: FastAPI):
     # Start periodic cleanup task
     cleanup_task = asyncio.create_task(periodic_cleanup(30))
     
+    # Initialize Dab credentials/client once, then warm up upstream connections in the background
+    from app.dab_service import dab_service
+    await dab_service.startup()
+    listenbrainz_service.start()
+    warmup_tasks = [
+        asyncio.create_task(concert_service.warm_up()),
+        asyncio.create_task(dab_service.warm_up()),
+        asyncio.create_task(genius_service.warm_up()),
+    ]
+    
     yield
     
     # Cleanup on shutdown
     cleanup_task.cancel()
-    await deezer_service.close()
-    await live_show_service.close()
-    await spotify_service.close()
-    await audio_service.close()
-    await podcast_service.close()
+    for task in warmup_tasks:
+        task.cancel()
+    await asyncio.gather(cleanup_task, *warmup_tasks, return_exceptions=True)
+    
+    # Close services concurrently so one slow teardown doesn't hold up the rest;
+    # the shared client goes last since the ListenBrainz flush still uses it
+    await asyncio.gather(
+        deezer_service.close(),
+        live_show_service.close(),
+        spotify_service.close(),
+        audio_service.close(),
+        podcast_service.close(),
+        listenbrainz_service.close(),
+        return_exceptions=True,
+    )
+    await close_shared_client()
     logger.info("Server shutdown complete.")
 
 
 app = FastAPI(
     title="Freedify Streaming",
     description="Stream music from Deezer, Spotify URLs, and Live Archives",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 # CORS for mobile access
@@ -81,6 +114,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Audio, archives and proxied images are already compressed, and gzip would break Range seeking
+_UNCOMPRESSED_PATHS = ("/api/stream/", "/api/download", "/api/proxy_image")
+
+
+class APIGZipMiddleware(GZipMiddleware):
+    """GZip JSON/text responses, passing audio and binary routes through untouched."""
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith(_UNCOMPRESSED_PATHS):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+app.add_middleware(APIGZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Middleware to set COOP header for Google OAuth popups
 @app.middleware("http")
 async def add_security_headers(request, call_next):
@@ -101,10 +150,14 @@ class ImportRequest(BaseModel):
 
 # ========== API ENDPOINTS ==========
 
+# Probes hit this constantly; serialize the body once
+_HEALTH_BODY = orjson.dumps({"status": "ok", "service": "freedify-streaming"})
+
+
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint."""
-    return {"status": "ok", "service": "freedify-streaming"}
+    return Response(content=_HEALTH_BODY, media_type="application/json")
 
 
 @app.get("/api/config")
@@ -114,6 +167,21 @@ async def get_config():
         "google_client_id": os.environ.get("GOOGLE_CLIENT_ID", ""),
     }
 
+# Fallback search providers by type; any other type searches tracks
+_DEEZER_SEARCH = {"album": deezer_service.search_albums, "artist": deezer_service.search_artists}
+_JAMENDO_SEARCH = {"album": jamendo_service.search_albums, "artist": jamendo_service.search_artists}
+
+# Per-upstream caps on concurrent search calls so one slow source can't tie up the server
+# (Deezer bounds itself inside DeezerService)
+SPOTIFY_SEARCH_SEM = asyncio.Semaphore(5)
+LIVE_SEARCH_SEM = asyncio.Semaphore(20)
+DAB_SEARCH_SEM = asyncio.Semaphore(20)
+JAMENDO_SEARCH_SEM = asyncio.Semaphore(20)
+
+# Live-show queries always name a year
+_YEAR_RE = re.compile(r"\b(?:19|20)\d{2}\b")
+
+
 @app.get("/api/search")
 async def search(
     q: str = Query(..., min_length=1, description="Search query"),
@@ -123,13 +191,14 @@ async def search(
     """Search for tracks, albums, artists, or podcasts."""
     try:
         # Check for Spotify URL (uses Spotify API - may be rate limited)
-        if spotify_service.is_spotify_url(q):
-            parsed = spotify_service.parse_spotify_url(q)
+        is_spotify, parsed = spotify_service.classify_url(q)
+        if is_spotify:
             if parsed:
                 url_type, item_id = parsed
                 logger.info(f"Detected Spotify URL: {url_type}/{item_id}")
                 try:
-                    return await get_spotify_content(url_type, item_id)
+                    async with SPOTIFY_SEARCH_SEM:
+                        return await get_spotify_content(url_type, item_id)
                 except HTTPException as e:
                     # If Spotify fails (rate limited), return error with info
                     raise HTTPException(
@@ -168,11 +237,13 @@ async def search(
             results = await setlist_service.search_setlists(q)
             return {"results": results, "query": q, "type": "album", "source": "setlist.fm", "offset": offset}
             
-        # Check for live show searches FIRST if no type specified or type is album
-        # But only if NOT one of the special types above (which returned already)
-        live_results = await live_show_service.search_live_shows(q)
-        if live_results is not None:
-            return {"results": live_results, "query": q, "type": "album", "source": "live_shows"}
+        # Check for live show searches FIRST for track/album searches
+        # (live-show queries always carry a year, so other queries skip the detector)
+        if type in ("album", "track") and _YEAR_RE.search(q):
+            async with LIVE_SEARCH_SEM:
+                live_results = await live_show_service.search_live_shows(q)
+            if live_results is not None:
+                return {"results": live_results, "query": q, "type": "album", "source": "live_shows"}
         
         # Regular search - Use Dab Music (Priority) then Deezer
         logger.info(f"Searching: {q} (type: {type}, offset: {offset})")
@@ -186,10 +257,11 @@ async def search(
         if type in ["album", "track"] and offset == 0:
             try:
                 from app.dab_service import dab_service
-                if type == "album":
-                    dab_results = await dab_service.search_albums(q, limit=10)
-                else:
-                    dab_results = await dab_service.search_tracks(q, limit=10)
+                async with DAB_SEARCH_SEM:
+                    if type == "album":
+                        dab_results = await dab_service.search_albums(q, limit=10)
+                    else:
+                        dab_results = await dab_service.search_tracks(q, limit=10)
                 
                 if dab_results:
                     logger.info(f"Found {len(dab_results)} results on Dab Music")
@@ -201,12 +273,8 @@ async def search(
         # 2. Fallback to Deezer if no Dab results
         if not results:
             logger.info(f"Falling back to Deezer search...")
-            if type == "album":
-                results = await deezer_service.search_albums(q, limit=20, offset=offset)
-            elif type == "artist":
-                results = await deezer_service.search_artists(q, limit=20, offset=offset)
-            else:
-                results = await deezer_service.search_tracks(q, limit=20, offset=offset)
+            search_fn = _DEEZER_SEARCH.get(type, deezer_service.search_tracks)
+            results = await search_fn(q, limit=20, offset=offset)
             if results:
                 source = "deezer"
         
@@ -214,12 +282,9 @@ async def search(
         if not results and type in ["track", "album", "artist"]:
             logger.info(f"Falling back to Jamendo search...")
             try:
-                if type == "album":
-                    results = await jamendo_service.search_albums(q, limit=20, offset=offset)
-                elif type == "artist":
-                    results = await jamendo_service.search_artists(q, limit=20, offset=offset)
-                else:
-                    results = await jamendo_service.search_tracks(q, limit=20, offset=offset)
+                search_fn = _JAMENDO_SEARCH.get(type, jamendo_service.search_tracks)
+                async with JAMENDO_SEARCH_SEM:
+                    results = await search_fn(q, limit=20, offset=offset)
                 if results:
                     source = "jamendo"
                     logger.info(f"Found {len(results)} results on Jamendo")
@@ -313,7 +378,50 @@ async def import_url_endpoint(request: ImportRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Metadata endpoint TTLs (seconds); stream/health responses are never cached here
+METADATA_CACHE_TTL = 24 * 3600
+PODCAST_CACHE_TTL = 3600
+# Playlists are user-editable, so edits should show up within minutes
+PLAYLIST_CACHE_TTL = 600
+AUDIO_FEATURES_CACHE_TTL = 7 * 24 * 3600
+
+
+def _endpoint_cache_key(prefix: str, item_id: str) -> str:
+    return f"endpoint:{prefix}:{item_id}"
+
+
+def cached_endpoint(prefix: str, id_param: str, ttl: Union[int, Callable[[str], int]]):
+    """
+    Cache a metadata endpoint's JSON result in Redis under "<prefix>:<id>" (no-op without REDIS_URL).
+    Hits are returned as the stored bytes without re-serializing. Every response also carries a
+    Cache-Control header so browsers and edge caches can keep it. ttl may be a function of the ID.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(**kwargs):
+            item_id = kwargs[id_param]
+            key = _endpoint_cache_key(prefix, item_id)
+            max_age = ttl(item_id) if callable(ttl) else ttl
+            headers = {"Cache-Control": f"public, max-age={max_age}"}
+            
+            cached = await get_cached_raw(key)
+            if cached is not None:
+                return Response(content=cached, media_type="application/json", headers=headers)
+            
+            result = await func(**kwargs)
+            await cache_json(key, result, max_age)
+            return ORJSONResponse(result, headers=headers)
+        return wrapper
+    return decorator
+
+
+def _album_cache_ttl(album_id: str) -> int:
+    # Podcast "albums" are episode feeds that grow over time
+    return PODCAST_CACHE_TTL if album_id.startswith(("pod_", "itunes_")) else METADATA_CACHE_TTL
+
+
 @app.get("/api/track/{track_id}")
+@cached_endpoint("track", "track_id", METADATA_CACHE_TTL)
 async def get_track(track_id: str):
     """Get track details by Spotify ID."""
     try:
@@ -328,69 +436,87 @@ async def get_track(track_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def _get_dab_album(album_id: str):
+    from app.dab_service import dab_service
+    album = await dab_service.get_album(album_id)
+    if album: return album
+    raise HTTPException(status_code=404, detail="Dab album not found")
+
+
+async def _get_deezer_album(album_id: str):
+    album = await deezer_service.get_album(album_id)
+    if album: return album
+    raise HTTPException(status_code=404, detail="Deezer album not found")
+
+
+async def _get_archive_album(album_id: str):
+    # Archive.org show - import via URL
+    identifier = album_id.removeprefix("archive_")
+    url = f"https://archive.org/details/{identifier}"
+    logger.info(f"Importing Archive.org show: {url}")
+    return await audio_service.import_url(url)
+
+
+async def _get_phish_album(album_id: str):
+    # Phish.in show - import via URL
+    date = album_id.removeprefix("phish_")
+    url = f"https://phish.in/{date}"
+    logger.info(f"Importing Phish.in show: {url}")
+    return await audio_service.import_url(url)
+
+
+async def _get_podcast_album(album_id: str):
+    # Podcast Import (PodcastIndex)
+    feed_id = album_id.removeprefix("pod_")
+    return await podcast_service.get_podcast_episodes(feed_id)
+
+
+async def _get_itunes_album(album_id: str):
+    # iTunes Podcast - fetch episodes via RSS
+    return await podcast_service.get_podcast_episodes(album_id)
+
+
+async def _get_setlist_album(album_id: str):
+    # Setlist.fm - get full setlist with tracks
+    setlist_id = album_id.removeprefix("setlist_")
+    album = await setlist_service.get_setlist(setlist_id)
+    if album and album.get("audio_source") == "phish.in":
+        # Phish show - fetch audio from phish.in
+        album["audio_available"] = True
+    elif album and album.get("audio_source") == "archive.org":
+        # Other artist - find best Archive.org version
+        archive_url = await setlist_service.find_best_archive_show(
+            album.get("artists", ""),
+            album.get("iso_date", "")
+        )
+        if archive_url:
+            album["audio_url"] = archive_url
+            album["audio_available"] = True
+        else:
+            # Fallback to search if no direct match
+            album["audio_available"] = True
+    return album
+
+
+# Album sources by ID prefix (the part before the first "_"); unknown prefixes try Deezer
+_ALBUM_HANDLERS = {
+    "dab": _get_dab_album,
+    "dz": _get_deezer_album,
+    "archive": _get_archive_album,
+    "phish": _get_phish_album,
+    "pod": _get_podcast_album,
+    "itunes": _get_itunes_album,
+    "setlist": _get_setlist_album,
+}
+
+
 @app.get("/api/album/{album_id}")
+@cached_endpoint("album", "album_id", _album_cache_ttl)
 async def get_album(album_id: str):
-    # Support Dab Albums
-    if album_id.startswith("dab_"):
-        from app.dab_service import dab_service
-        album = await dab_service.get_album(album_id)
-        if album: return album
-        raise HTTPException(status_code=404, detail="Dab album not found")
-        
-    # Support Deezer Albums (fallback logic handled in dedicated service or here)
-    if album_id.startswith("dz_"):
-        album = await deezer_service.get_album(album_id)
-        if album: return album
-        raise HTTPException(status_code=404, detail="Deezer album not found")
-
     """Get album details with all tracks."""
     try:
-        # Handle different sources based on ID prefix
-        if album_id.startswith("dz_"):
-            # Deezer album
-            album = await deezer_service.get_album(album_id)
-        elif album_id.startswith("archive_"):
-            # Archive.org show - import via URL
-            identifier = album_id.replace("archive_", "")
-            url = f"https://archive.org/details/{identifier}"
-            logger.info(f"Importing Archive.org show: {url}")
-            album = await audio_service.import_url(url)
-        elif album_id.startswith("phish_"):
-            # Phish.in show - import via URL 
-            date = album_id.replace("phish_", "")
-            url = f"https://phish.in/{date}"
-            logger.info(f"Importing Phish.in show: {url}")
-            album = await audio_service.import_url(url)
-        elif album_id.startswith("pod_"):
-            # Podcast Import (PodcastIndex)
-            feed_id = album_id.replace("pod_", "")
-            album = await podcast_service.get_podcast_episodes(feed_id)
-        elif album_id.startswith("itunes_"):
-            # iTunes Podcast - fetch episodes via RSS
-            album = await podcast_service.get_podcast_episodes(album_id)
-        elif album_id.startswith("setlist_"):
-            # Setlist.fm - get full setlist with tracks
-            setlist_id = album_id.replace("setlist_", "")
-            album = await setlist_service.get_setlist(setlist_id)
-            if album and album.get("audio_source") == "phish.in":
-                # Phish show - fetch audio from phish.in
-                album["audio_available"] = True
-            elif album and album.get("audio_source") == "archive.org":
-                # Other artist - find best Archive.org version
-                archive_url = await setlist_service.find_best_archive_show(
-                    album.get("artists", ""),
-                    album.get("iso_date", "")
-                )
-                if archive_url:
-                    album["audio_url"] = archive_url
-                    album["audio_available"] = True
-                else:
-                    # Fallback to search if no direct match
-                    album["audio_available"] = True
-        else:
-            # Unknown source - try Deezer
-            album = await deezer_service.get_album(album_id)
-        
+        handler = _ALBUM_HANDLERS.get(album_id.partition("_")[0], deezer_service.get_album)
+        album = await handler(album_id)
         if not album:
             raise HTTPException(status_code=404, detail="Album not found")
         return album
@@ -402,6 +528,7 @@ async def get_album(album_id: str):
 
 
 @app.get("/api/playlist/{playlist_id}")
+@cached_endpoint("playlist", "playlist_id", PLAYLIST_CACHE_TTL)
 async def get_playlist(playlist_id: str):
     """Get playlist details with all tracks."""
     try:
@@ -417,6 +544,7 @@ async def get_playlist(playlist_id: str):
 
 
 @app.get("/api/artist/{artist_id}")
+@cached_endpoint("artist", "artist_id", METADATA_CACHE_TTL)
 async def get_artist(artist_id: str):
     """Get artist details with top tracks."""
     try:
@@ -435,6 +563,49 @@ async def get_artist(artist_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# Upstream audio proxies get a longer timeout than API calls
+PROXY_TIMEOUT = 60.0
+
+@functools.lru_cache(maxsize=4096)
+def _decode_link(encoded_url: str) -> Tuple[str, Optional[str]]:
+    """Decode a LINK: id payload into (original_url, mime type if it's a direct audio file)."""
+    original_url = base64.urlsafe_b64decode(encoded_url).decode()
+    return original_url, direct_audio_mime(original_url)
+
+
+# When set (e.g. "/_cache/"), nginx serves cache hits itself via an internal location
+X_ACCEL_CACHE_PREFIX = os.environ.get("X_ACCEL_CACHE_PREFIX", "")
+
+# Concurrent plays of the same uncached track share one upstream fetch + cache write
+_stream_inflight = SingleFlight()
+
+
+async def _fetch_stream_audio(isrc: str, query: str, hires: bool, cache_ext: str):
+    """Fetch audio for streaming; byte results are written to the disk cache. Returns (result, cached)."""
+    result = await audio_service.fetch_flac(isrc, query, hires=hires)
+    if result and not isinstance(result[0], str):
+        return result, await cache_file(isrc, result[0], cache_ext)
+    return result, False
+
+
+# ISRC + format identify a download payload, so it can be cached forever and revalidated by ETag
+_AUDIO_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# Streams depend on which source answered (Hi-Res or a fallback), so clients revalidate daily
+_STREAM_CACHE_CONTROL = "public, max-age=86400"
+
+
+def _audio_etag(isrc: str, fmt: str) -> str:
+    return f'"{isrc}-{fmt}"'
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Check an If-None-Match header (weak comparison) against our ETag."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    return any(tag.strip().removeprefix("W/") in (etag, "*") for tag in if_none_match.split(","))
+
+
 @app.api_route("/api/stream/{isrc}", methods=["GET", "HEAD"])
 async def stream_audio(
     request: Request,
@@ -447,22 +618,20 @@ async def stream_audio(
         logger.info(f"Stream request for ISRC: {isrc} (hires={hires})")
         
         target_stream_url = None
+        target_mime = "audio/mpeg"
         
         # 1. Resolve Target Stream URL (Direct or via yt-dlp)
         
         # Handle Imported Links (LINK:)
         if isrc.startswith("LINK:"):
-            import base64
-            from urllib.parse import urlparse
             try:
-                encoded_url = isrc.replace("LINK:", "")
-                original_url = base64.urlsafe_b64decode(encoded_url).decode()
+                # Decoding is cached: seeks re-request the same LINK id
+                original_url, direct_mime = _decode_link(isrc.removeprefix("LINK:"))
                 
                 # Check for direct file extension first (fast path)
-                parsed = urlparse(original_url)
-                audio_exts = ('.mp3', '.m4a', '.ogg', '.wav', '.aac', '.opus', '.flac')
-                if any(parsed.path.lower().endswith(ext) for ext in audio_exts):
+                if direct_mime:
                      target_stream_url = original_url
+                     target_mime = direct_mime
                 else:
                     # Try to extract stream via yt-dlp (for YouTube/SoundCloud links)
                     # Run in executor to avoid blocking
@@ -474,14 +643,14 @@ async def stream_audio(
 
         # Handle YouTube Music (ytm_)
         elif isrc.startswith("ytm_"):
-             video_id = isrc.replace("ytm_", "")
+             video_id = isrc.removeprefix("ytm_")
              youtube_url = f"https://music.youtube.com/watch?v={video_id}"
              loop = asyncio.get_event_loop()
              target_stream_url = await loop.run_in_executor(None, audio_service._get_stream_url, youtube_url)
 
         # Handle Jamendo (jm_) - Direct stream/download URLs
         elif isrc.startswith("jm_"):
-            track_id = isrc.replace("jm_", "")
+            track_id = isrc.removeprefix("jm_")
             target_stream_url = await jamendo_service.get_stream_url(track_id, prefer_flac=hires)
 
         # 2. Proxy the Target Stream (if found)
@@ -497,9 +666,9 @@ async def stream_audio(
 
 
             try:
-                # Create a local client instance (not shared).
-                client = httpx.AsyncClient(follow_redirects=True, timeout=60.0)
-                req = client.build_request("GET", target_stream_url, headers=req_headers)
+                # Pooled client: repeat streams reuse keep-alive connections
+                client = get_shared_client()
+                req = client.build_request("GET", target_stream_url, headers=req_headers, timeout=PROXY_TIMEOUT)
                 r = await client.send(req, stream=True)
                 
                 # Prepare headers
@@ -512,7 +681,7 @@ async def stream_audio(
                     if r.headers.get(key):
                         resp_headers[key] = r.headers[key]
                 
-                # Custom iterator that closes the LOCAL client
+                # Iterator that releases the upstream connection back to the pool
                 async def response_iterator():
                     try:
                         async for chunk in r.aiter_bytes(chunk_size=65536):
@@ -520,14 +689,12 @@ async def stream_audio(
                     except Exception as e:
                         logger.error(f"Stream iteration error: {e}")
                     finally:
-                        # Close the response AND the client
                         await r.aclose()
-                        await client.aclose()
                 
                 return StreamingResponse(
                     response_iterator(),
                     status_code=r.status_code,
-                    media_type=r.headers.get("Content-Type", "audio/mpeg"),
+                    media_type=r.headers.get("Content-Type", target_mime),
                     headers=resp_headers
                 )
             except Exception as e:
@@ -536,26 +703,36 @@ async def stream_audio(
         
         # 3. Standard / HiFi Playback (Fallback or standard sources)
         
-        # Force FLAC/Hi-Res path (MP3 option removed)
-        cache_ext = "flac"
+        # Force FLAC/Hi-Res path (MP3 option removed). Hi-Res and standard requests can get
+        # different payloads, so they're cached (and ETagged) as separate files.
+        cache_ext = "flac" if hires else "std.flac"
         mime_type = "audio/flac"
+        etag = _audio_etag(isrc, cache_ext)
         
-        # Check cache
+        # Check cache (FileResponse hands full-file responses to the server via the ASGI
+        # pathsend extension where supported, so the bytes never pass through Python)
         if is_cached(isrc, cache_ext):
+            # Client already has this exact payload
+            if _etag_matches(request, etag):
+                return Response(status_code=304, headers={"ETag": etag, "Cache-Control": _STREAM_CACHE_CONTROL})
+            
             cache_path = get_cache_path(isrc, cache_ext)
             logger.info(f"Serving from cache ({cache_ext}): {cache_path}")
-            return FileResponse(
-                cache_path,
-                media_type=mime_type,
-                headers={"Accept-Ranges": "bytes", "Cache-Control": "public, max-age=86400"}
-            )
+            headers = {"Accept-Ranges": "bytes", "Cache-Control": _STREAM_CACHE_CONTROL, "ETag": etag}
+            if X_ACCEL_CACHE_PREFIX:
+                # nginx handles the transfer (sendfile) and Range requests
+                headers["X-Accel-Redirect"] = f"{X_ACCEL_CACHE_PREFIX}{cache_path.name}"
+                return Response(media_type=mime_type, headers=headers)
+            return FileResponse(cache_path, media_type=mime_type, headers=headers)
         
         
         # 4. Standard / HiFi Playback (Uses fetch_flac with internal priorities: Dab -> Tidal -> Deezer)
         
         # Standard: Fetch FLAC directly (Hifi/Hi-Res) - Skip MP3 transcoding
         # The user requested to remove non-hifi options for efficiency.
-        result = await audio_service.fetch_flac(isrc, q or "", hires=hires)
+        result, cached = await _stream_inflight.do(
+            (isrc, cache_ext), lambda: _fetch_stream_audio(isrc, q or "", hires, cache_ext)
+        )
         
         if not result:
             raise HTTPException(status_code=404, detail="Could not fetch audio")
@@ -576,65 +753,69 @@ async def stream_audio(
                 logger.info(f"Forwarding Range header: {req_headers['Range']}")
 
             # Make initial request to get status/headers
-            client = httpx.AsyncClient(timeout=60.0, follow_redirects=True)
-            try:
-                upstream_req = client.build_request("GET", target_stream_url, headers=req_headers)
-                upstream_resp = await client.send(upstream_req, stream=True)
-                
-                # Build response headers
-                resp_headers = {
-                    "Accept-Ranges": "bytes",
-                    "Cache-Control": "public, max-age=3600",
-                    "Access-Control-Allow-Origin": "*"
-                }
-                
-                # Forward important headers from upstream
-                for key in ["Content-Range", "Content-Length", "Content-Type"]:
-                    if upstream_resp.headers.get(key):
-                        resp_headers[key] = upstream_resp.headers[key]
-                
-                if metadata and metadata.get("is_hi_res"):
-                    resp_headers["X-Audio-Quality"] = "Hi-Res"
-                    resp_headers["X-Audio-Format"] = "FLAC"
+            client = get_shared_client()
+            upstream_req = client.build_request("GET", target_stream_url, headers=req_headers, timeout=PROXY_TIMEOUT)
+            upstream_resp = await client.send(upstream_req, stream=True)
+            
+            # Build response headers
+            resp_headers = {
+                "Accept-Ranges": "bytes",
+                "Cache-Control": "public, max-age=3600",
+                "Access-Control-Allow-Origin": "*"
+            }
+            
+            # Forward important headers from upstream
+            for key in ["Content-Range", "Content-Length", "Content-Type"]:
+                if upstream_resp.headers.get(key):
+                    resp_headers[key] = upstream_resp.headers[key]
+            
+            if metadata and metadata.get("is_hi_res"):
+                resp_headers["X-Audio-Quality"] = "Hi-Res"
+                resp_headers["X-Audio-Format"] = "FLAC"
 
-                # Iterator that closes client when done
-                async def response_iterator():
-                    try:
-                        async for chunk in upstream_resp.aiter_bytes(chunk_size=65536):
-                            yield chunk
-                    except Exception as e:
-                        logger.error(f"Stream iteration error: {e}")
-                    finally:
-                        await upstream_resp.aclose()
-                        await client.aclose()
-                
-                return StreamingResponse(
-                    response_iterator(),
-                    status_code=upstream_resp.status_code,  # 200 or 206
-                    media_type=upstream_resp.headers.get("Content-Type", "audio/flac"), 
-                    headers=resp_headers
-                )
-            except Exception as e:
-                await client.aclose()
-                raise
+            # Iterator that releases the upstream connection when done
+            async def response_iterator():
+                try:
+                    async for chunk in upstream_resp.aiter_bytes(chunk_size=65536):
+                        yield chunk
+                except Exception as e:
+                    logger.error(f"Stream iteration error: {e}")
+                finally:
+                    await upstream_resp.aclose()
+            
+            return StreamingResponse(
+                response_iterator(),
+                status_code=upstream_resp.status_code,  # 200 or 206
+                media_type=upstream_resp.headers.get("Content-Type", "audio/flac"), 
+                headers=resp_headers
+            )
             
         else:
-            # It's bytes! Serve directly.
+            # It's bytes! Persist to the cache and serve from disk so Range requests work
+            # (and later plays hit the cached branch above).
             flac_data, metadata = result
             
             headers = {
                 "Accept-Ranges": "bytes",
-                "Content-Length": str(len(flac_data)),
-                "Cache-Control": "public, max-age=86400",
+                "Cache-Control": _STREAM_CACHE_CONTROL,
+                "ETag": etag,
                 "X-Audio-Format": "FLAC"
             }
             
             if metadata and metadata.get("is_hi_res"):
                 headers["X-Audio-Quality"] = "Hi-Res"
-                
+            
+            if cached:
+                return FileResponse(
+                    get_cache_path(isrc, cache_ext),
+                    media_type=mime_type,
+                    headers=headers
+                )
+            
+            headers["Content-Length"] = str(len(flac_data))
             return Response(
                 content=flac_data,
-                media_type="audio/flac",
+                media_type=mime_type,
                 headers=headers
             )
         
@@ -647,6 +828,7 @@ async def stream_audio(
 
 @app.get("/api/download/{isrc}")
 async def download_audio(
+    request: Request,
     isrc: str,
     q: Optional[str] = Query(None, description="Search query hint"),
     format: str = Query("mp3", description="Audio format: mp3, flac, aiff, wav, alac"),
@@ -656,6 +838,10 @@ async def download_audio(
     try:
         logger.info(f"Download request for {isrc} in {format}")
         
+        etag = _audio_etag(isrc, format)
+        if _etag_matches(request, etag):
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": _AUDIO_CACHE_CONTROL})
+        
         result = await audio_service.get_download_audio(isrc, q or "", format)
         
         if not result:
@@ -671,7 +857,9 @@ async def download_audio(
             media_type=mime,
             headers={
                 "Content-Disposition": f'attachment; filename="{download_name}"',
-                "Content-Length": str(len(data))
+                "Content-Length": str(len(data)),
+                "Cache-Control": _AUDIO_CACHE_CONTROL,
+                "ETag": etag
             }
         )
         
@@ -691,6 +879,10 @@ class TrackForFeatures(BaseModel):
     artists: Optional[str] = None
 
 
+# Concurrent per-track lookups in /api/audio-features/batch
+FEATURES_CONCURRENCY = int(os.getenv("FEATURES_CONCURRENCY", "10"))
+
+
 class AudioFeaturesBatchRequest(BaseModel):
     tracks: List[TrackForFeatures]
 
@@ -709,7 +901,23 @@ class SetlistRequest(BaseModel):
     style: str = "progressive"  # progressive, peak-time, chill, journey
 
 
+def _json_body_schema(model) -> dict:
+    """OpenAPI requestBody for endpoints that parse their JSON body themselves."""
+    return {"requestBody": {"required": True, "content": {"application/json": {"schema": model.model_json_schema()}}}}
+
+
+async def _parse_json_body(request: Request, model):
+    """Decode a (potentially large) JSON body with orjson and validate it into `model`; 422 on bad input."""
+    try:
+        return model.model_validate(orjson.loads(await request.body()))
+    except orjson.JSONDecodeError as e:
+        raise RequestValidationError([{"type": "json_invalid", "loc": ("body",), "msg": str(e), "input": {}}])
+    except ValidationError as e:
+        raise RequestValidationError(e.errors())
+
+
 @app.get("/api/audio-features/{track_id}")
+@cached_endpoint("audio-features", "track_id", AUDIO_FEATURES_CACHE_TTL)
 async def get_audio_features(
     track_id: str,
     isrc: Optional[str] = Query(None),
@@ -729,43 +937,68 @@ async def get_audio_features(
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/api/audio-features/batch")
-async def get_audio_features_batch(request: AudioFeaturesBatchRequest):
+@app.post("/api/audio-features/batch", openapi_extra=_json_body_schema(AudioFeaturesBatchRequest))
+async def get_audio_features_batch(raw_request: Request):
     """Get audio features for multiple tracks."""
+    request = await _parse_json_body(raw_request, AudioFeaturesBatchRequest)
     try:
         if not request.tracks:
             return {"features": []}
         
-        # Process each track, handling Deezer tracks with ISRC/name lookup
-        features = []
-        for track in request.tracks:
-            feat = await spotify_service.get_audio_features(
-                track.id, 
-                track.isrc, 
-                track.name, 
-                track.artists
-            )
-            
-            # Fallback to AI estimation if Spotify fails
-            if not feat and track.name and track.artists:
-                feat = await dj_service.get_audio_features_ai(track.name, track.artists)
-                if feat:
-                    feat['track_id'] = track.id  # Match requested ID for frontend cache
-            
-            features.append(feat)
+        tracks = request.tracks
+        
+        # 1. One MGET for everything already cached (shared with /api/audio-features/{id})
+        keys = [_endpoint_cache_key("audio-features", track.id) for track in tracks]
+        features = await get_cached_json_many(keys)
+        misses = [i for i, feat in enumerate(features) if feat is None]
+        
+        # 2. Spotify IDs go through the bulk endpoint (100 IDs per request). Other sources'
+        # IDs stay out of it: one invalid ID makes Spotify reject the whole request.
+        spotify_misses = [i for i in misses if is_spotify_id(tracks[i].id)]
+        if spotify_misses:
+            bulk = await spotify_service.get_audio_features_batch([tracks[i].id for i in spotify_misses])
+            for i, feat in zip(spotify_misses, bulk):
+                features[i] = feat
+        
+        # 3. Other sources' tracks (need an ISRC/name lookup first) and AI fallbacks run concurrently (bounded)
+        semaphore = asyncio.Semaphore(FEATURES_CONCURRENCY)
+        
+        async def fetch_features(track: TrackForFeatures, feat):
+            async with semaphore:
+                if not feat and not is_spotify_id(track.id):
+                    feat = await spotify_service.get_audio_features(
+                        track.id, 
+                        track.isrc, 
+                        track.name, 
+                        track.artists
+                    )
+                
+                # Fallback to AI estimation if Spotify fails
+                if not feat and track.name and track.artists:
+                    feat = await dj_service.get_audio_features_ai(track.name, track.artists)
+                    if feat:
+                        feat['track_id'] = track.id  # Match requested ID for frontend cache
+                
+                return feat
         
+        fetched = await asyncio.gather(*(fetch_features(tracks[i], features[i]) for i in misses))
+        for i, feat in zip(misses, fetched):
+            features[i] = feat
+        
+        # 4. Store fresh results in one pipelined round-trip
+        await cache_json_many(
+            {keys[i]: features[i] for i in misses if features[i]}, AUDIO_FEATURES_CACHE_TTL
+        )
         return {"features": features}
     except Exception as e:
         logger.error(f"Batch audio features error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
-    except Exception as e:
-        logger.error(f"Batch audio features error: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/api/dj/generate-setlist")
-async def generate_setlist(request: SetlistRequest):
+@app.post("/api/dj/generate-setlist", openapi_extra=_json_body_schema(SetlistRequest))
+async def generate_setlist(raw_request: Request):
     """Generate AI-optimized DJ setlist ordering."""
+    request = await _parse_json_body(raw_request, SetlistRequest)
     try:
         tracks = [t.model_dump() for t in request.tracks]
         result = await dj_service.generate_setlist(tracks, request.style)
@@ -861,6 +1094,35 @@ async def ai_generate_playlist(request: GeneratePlaylistRequest):
 # Format: { "download_id": { "current": 0, "total": 0, "status": "processing" } }
 download_progress = {}
 
+# Filename sanitizing in one str.translate pass: path separators/colons -> "_", other reserved chars dropped
+_FN_TRANSLATE = str.maketrans({c: "_" for c in "/\\:"} | {c: None for c in '*?"<>|'})
+_ALBUM_TRANSLATE = str.maketrans({c: "_" for c in "/\\:"})
+# Tracks fetched in parallel per batch download
+BATCH_DOWNLOAD_CONCURRENCY = 4
+# Formats stored as-is in batch ZIPs (re-deflating compressed audio, or PCM, saves ~nothing for the CPU it costs)
+_COMPRESSED_AUDIO_EXTS = {".mp3", ".flac", ".m4a", ".aac", ".ogg", ".opus", ".aiff", ".wav"}
+
+
+class _ZipStreamSink(io.RawIOBase):
+    """Write-only, unseekable sink for zipfile whose output is drained into a streaming response."""
+    
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+    
+    def writable(self) -> bool:
+        return True
+    
+    def write(self, b) -> int:
+        self._chunks.append(bytes(b))
+        return len(b)
+    
+    def drain(self) -> bytes:
+        """Return and forget everything written so far."""
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
 class BatchDownloadRequest(BaseModel):
     tracks: List[str]  # List of ISRCs or IDs
     names: List[str]   # List of track names for filenames
@@ -885,113 +1147,119 @@ async def get_progress(download_id: str):
 
 @app.post("/api/download-batch")
 async def download_batch(request: BatchDownloadRequest):
-    """Download multiple tracks as a ZIP file with parallel processing."""
-    try:
-        final_name = request.zip_name or request.album_name or "download"
-        logger.info(f"Batch download request: {len(request.tracks)} tracks from {final_name}")
-        
-        # In-memory ZIP buffer
-        zip_buffer = io.BytesIO()
-        
-        # Initialize progress tracking
-        if request.download_id:
-            download_progress[request.download_id] = {
-                "current": 0, 
-                "total": len(request.tracks),
-                "status": "processing"
+    """Download multiple tracks as a ZIP file, streamed to the client as tracks finish."""
+    final_name = request.zip_name or request.album_name or "download"
+    logger.info(f"Batch download request: {len(request.tracks)} tracks from {final_name}")
+    
+    # Initialize progress tracking
+    if request.download_id:
+        download_progress[request.download_id] = {
+            "current": 0, 
+            "total": len(request.tracks),
+            "status": "processing"
+        }
+    
+    # Fetch tracks concurrently (bounded); entries are written in track order as they become ready
+    semaphore = asyncio.Semaphore(BATCH_DOWNLOAD_CONCURRENCY)
+    
+    async def fetch_track(i: int, isrc: str):
+        async with semaphore:
+            logger.info(f"Starting track {i+1}/{len(request.tracks)}: {request.names[i]}")
+            
+            query = f"{request.names[i]} {request.artists[i]}"
+            
+            # Build metadata
+            provided_metadata = {
+                "title": request.names[i],
+                "artists": request.artists[i],
+                "album": request.album_name,
+                "year": request.release_year or "",
+                "album_art_url": request.album_art_urls[i] if request.album_art_urls and i < len(request.album_art_urls) else None,
+                "total_tracks": len(request.tracks) * request.total_parts if request.album_name else None
             }
-        
-        # Concurrency control (3 concurrent downloads)
-        semaphore = asyncio.Semaphore(3)
-        zip_lock = asyncio.Lock()
+            
+            # Download
+            result = await audio_service.get_download_audio(
+                isrc, 
+                query, 
+                request.format,
+                track_number=i+1,
+                provided_metadata=provided_metadata
+            )
+            
+            # Update progress
+            if result and request.download_id:
+                download_progress[request.download_id]["current"] += 1
+            return result
+    
+    async def zip_stream():
+        tasks = [asyncio.create_task(fetch_track(i, isrc)) for i, isrc in enumerate(request.tracks)]
+        sink = _ZipStreamSink()
         used_names = set()
-        
-        async def process_track(i: int, isrc: str):
-            async with semaphore:
-                try:
-                    logger.info(f"Starting track {i+1}/{len(request.tracks)}: {request.names[i]}")
+        total_bytes = 0
+        try:
+            with zipfile.ZipFile(sink, "w", zipfile.ZIP_STORED) as zip_file:
+                for i, (isrc, task) in enumerate(zip(request.tracks, tasks)):
+                    try:
+                        result = await task
+                    except Exception as e:
+                        logger.error(f"Failed to download track {isrc}: {e}")
+                        # Don't raise, just continue (partial success)
+                        continue
+                    if not result:
+                        continue
                     
-                    query = f"{request.names[i]} {request.artists[i]}"
+                    data, ext, _ = result
                     
-                    # Build metadata
-                    provided_metadata = {
-                        "title": request.names[i],
-                        "artists": request.artists[i],
-                        "album": request.album_name,
-                        "year": request.release_year or "",
-                        "album_art_url": request.album_art_urls[i] if request.album_art_urls and i < len(request.album_art_urls) else None,
-                        "total_tracks": len(request.tracks) * request.total_parts if request.album_name else None
-                    }
+                    # Calculate filename
+                    safe_name = f"{request.artists[i]} - {request.names[i]}".translate(_FN_TRANSLATE)
+                    filename = f"{safe_name}{ext}"
                     
-                    # Download
-                    result = await audio_service.get_download_audio(
-                        isrc, 
-                        query, 
-                        request.format,
-                        track_number=i+1,
-                        provided_metadata=provided_metadata
-                    )
+                    # Handle duplicates
+                    count = 1
+                    while filename in used_names:
+                        filename = f"{safe_name} ({count}){ext}"
+                        count += 1
+                    used_names.add(filename)
                     
-                    if result:
-                        data, ext, _ = result
-                        
-                        # Calculate filename
-                        safe_name = f"{request.artists[i]} - {request.names[i]}".replace("/", "_").replace("\\", "_").replace(":", "_").replace("*", "").replace("?", "").replace('"', "").replace("<", "").replace(">", "").replace("|", "")
-                        filename = f"{safe_name}{ext}"
-                        
-                        # Write to ZIP (atomic operation via lock)
-                        async with zip_lock:
-                            # Handle duplicates
-                            count = 1
-                            base_filename = filename
-                            while filename in used_names:
-                                filename = f"{safe_name} ({count}){ext}"
-                                count += 1
-                            used_names.add(filename)
-                            
-                            zip_file.writestr(filename, data)
-                            logger.info(f"Added to ZIP: {filename}")
-                            
-                            # Update progress
-                            if request.download_id:
-                                download_progress[request.download_id]["current"] += 1
-                                
-                except Exception as e:
-                    logger.error(f"Failed to download track {isrc}: {e}")
-                    # Don't raise, just continue (partial success)
-        
-        with zipfile.ZipFile(zip_buffer, "w", zipfile.ZIP_DEFLATED) as zip_file:
-            # Create tasks
-            tasks = [process_track(i, isrc) for i, isrc in enumerate(request.tracks)]
-            await asyncio.gather(*tasks)
-
-        # Cleanup progress
-        if request.download_id and request.download_id in download_progress:
-            del download_progress[request.download_id]
-        
-        zip_buffer.seek(0)
-        final_name = request.zip_name or request.album_name or "download"
-        safe_album = final_name.replace("/", "_").replace("\\", "_").replace(":", "_")
-        
-        # Name ZIP with part number
-        if request.total_parts > 1:
-            filename = f"{safe_album} (Part {request.part} of {request.total_parts}).zip"
-        else:
-            filename = f"{safe_album}.zip"
-        
-        logger.info(f"ZIP complete: {filename} ({len(zip_buffer.getvalue())} bytes)")
-        
-        return Response(
-            content=zip_buffer.getvalue(),
-            media_type="application/zip",
-            headers={
-                "Content-Disposition": f'attachment; filename="{filename}"'
-            }
-        )
-        
-    except Exception as e:
-        logger.error(f"Batch download error: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+                    # Already-compressed audio gains nothing from DEFLATE
+                    compress_type = zipfile.ZIP_STORED if ext.lower() in _COMPRESSED_AUDIO_EXTS else zipfile.ZIP_DEFLATED
+                    await asyncio.to_thread(zip_file.writestr, filename, data, compress_type)
+                    logger.info(f"Added to ZIP: {filename}")
+                    
+                    chunk = sink.drain()
+                    total_bytes += len(chunk)
+                    yield chunk
+                
+                # Central directory (one record per entry) is written off-loop too
+                await asyncio.to_thread(zip_file.close)
+            
+            chunk = sink.drain()
+            total_bytes += len(chunk)
+            yield chunk
+            logger.info(f"ZIP complete: {zip_name} ({total_bytes} bytes)")
+        finally:
+            # Client went away or we're done: stop outstanding fetches, cleanup progress
+            for task in tasks:
+                task.cancel()
+            if request.download_id:
+                download_progress.pop(request.download_id, None)
+    
+    safe_album = final_name.translate(_ALBUM_TRANSLATE)
+    
+    # Name ZIP with part number
+    if request.total_parts > 1:
+        zip_name = f"{safe_album} (Part {request.part} of {request.total_parts}).zip"
+    else:
+        zip_name = f"{safe_album}.zip"
+    
+    return StreamingResponse(
+        zip_stream(),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f'attachment; filename="{zip_name}"'
+        }
+    )
 
 
 # ========== GOOGLE DRIVE ==========
@@ -1069,12 +1337,19 @@ STATIC_DIR = os.path.join(BASE_DIR, "static")
 if os.path.exists(STATIC_DIR):
     app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
 
+# Top-level static files are checked once at import: name -> path (only if present)
+_STATIC_FILES = {
+    name: path
+    for name in ("index.html", "manifest.json", "sw.js")
+    if os.path.exists(path := os.path.join(STATIC_DIR, name))
+}
+
 
 @app.get("/")
 async def index():
     """Serve the main page."""
-    index_path = os.path.join(STATIC_DIR, "index.html")
-    if os.path.exists(index_path):
+    index_path = _STATIC_FILES.get("index.html")
+    if index_path:
         return FileResponse(index_path)
     return {"message": "Freedify Streaming Server", "docs": "/docs"}
 
@@ -1082,8 +1357,8 @@ async def index():
 @app.get("/manifest.json")
 async def manifest():
     """Serve PWA manifest."""
-    manifest_path = os.path.join(STATIC_DIR, "manifest.json")
-    if os.path.exists(manifest_path):
+    manifest_path = _STATIC_FILES.get("manifest.json")
+    if manifest_path:
         return FileResponse(manifest_path, media_type="application/json")
     raise HTTPException(status_code=404)
 
@@ -1091,8 +1366,8 @@ async def manifest():
 @app.get("/sw.js")
 async def service_worker():
     """Serve service worker."""
-    sw_path = os.path.join(STATIC_DIR, "sw.js")
-    if os.path.exists(sw_path):
+    sw_path = _STATIC_FILES.get("sw.js")
+    if sw_path:
         return FileResponse(sw_path, media_type="application/javascript")
     raise HTTPException(status_code=404)
 
@@ -1165,9 +1440,9 @@ async def listenbrainz_stats(username: str):
 # ========== GENIUS LYRICS ==========
 
 @app.get("/api/lyrics")
-async def get_lyrics(artist: str, title: str):
-    """Get lyrics and song info from Genius."""
-    result = await genius_service.get_lyrics_and_info(artist, title)
+async def get_lyrics(artist: str, title: str, genius_url: Optional[str] = None):
+    """Get lyrics and song info from Genius (genius_url skips the song search)."""
+    result = await genius_service.get_lyrics_and_info(artist, title, genius_url)
     return result
 
 
@@ -1178,18 +1453,17 @@ async def proxy_image(url: str):
         raise HTTPException(status_code=400, detail="No URL provided")
     
     try:
-        async with httpx.AsyncClient() as client:
-            resp = await client.get(url, follow_redirects=True)
-            if resp.status_code != 200:
-                raise HTTPException(status_code=resp.status_code, detail="Failed to fetch image")
-            
-            return Response(
-                content=resp.content,
-                media_type=resp.headers.get("Content-Type", "image/jpeg"),
-                headers={
-                    "Cache-Control": "public, max-age=86400"
-                }
-            )
+        resp = await get_shared_client().get(url, follow_redirects=True)
+        if resp.status_code != 200:
+            raise HTTPException(status_code=resp.status_code, detail="Failed to fetch image")
+        
+        return Response(
+            content=resp.content,
+            media_type=resp.headers.get("Content-Type", "image/jpeg"),
+            headers={
+                "Cache-Control": "public, max-age=86400"
+            }
+        )
     except Exception as e:
         logger.error(f"Image proxy error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1209,7 +1483,10 @@ async def search_concerts(
     try:
         logger.info(f"Concert search for: {artist} (city: {city})")
         events = await concert_service.search_events(artist, city, limit=20)
-        return {"events": events, "artist": artist, "city": city}
+        return Response(
+            msgspec.json.encode({"events": events, "artist": artist, "city": city}),
+            media_type="application/json"
+        )
     except Exception as e:
         logger.error(f"Concert search error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1234,7 +1511,10 @@ async def get_concerts_for_artists(
         logger.info(f"Concert search for {len(artist_list)} artists, cities: {city_list}")
         events = await concert_service.get_events_for_artists(artist_list, city_list)
         
-        return {"events": events, "artists": artist_list, "cities": city_list}
+        return Response(
+            msgspec.json.encode({"events": events, "artists": artist_list, "cities": city_list}),
+            media_type="application/json"
+        )
     except Exception as e:
         logger.error(f"Concerts for artists error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
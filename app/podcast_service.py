@@ -10,19 +10,22 @@ import base64
 import os
 from typing import List, Dict, Any, Optional
 
+from app.http_client import PooledClientMixin
+
 logger = logging.getLogger(__name__)
 
 # API Keys - MUST be set via environment variables
 PODCASTINDEX_KEY = os.getenv("PODCASTINDEX_KEY", "")
 PODCASTINDEX_SECRET = os.getenv("PODCASTINDEX_SECRET", "")
 
-class PodcastService:
+class PodcastService(PooledClientMixin):
     """Service for searching podcasts via PodcastIndex API."""
     
     BASE_URL = "https://api.podcastindex.org/api/1.0"
+    TIMEOUT = 15.0
     
-    def __init__(self):
-        self.client = httpx.AsyncClient(timeout=15.0)
+    def __init__(self, client: Optional[httpx.AsyncClient] = None, owns_client: bool = False):
+        self._bind_client(client, owns_client)
         self.api_key = PODCASTINDEX_KEY
         self.api_secret = PODCASTINDEX_SECRET
 
@@ -55,7 +58,8 @@ class PodcastService:
             response = await self.client.get(
                 f"{self.BASE_URL}/search/byterm",
                 params=params,
-                headers=self._get_auth_headers()
+                headers=self._get_auth_headers(),
+                timeout=self.TIMEOUT
             )
             
             if response.status_code != 200:
@@ -82,7 +86,8 @@ class PodcastService:
                     "term": query,
                     "media": "podcast",
                     "limit": limit
-                }
+                },
+                timeout=self.TIMEOUT
             )
             
             if response.status_code != 200:
@@ -122,7 +127,7 @@ class PodcastService:
         try:
             # Handle iTunes podcasts - need to look up feed URL first
             if feed_id.startswith("itunes_"):
-                collection_id = feed_id.replace("itunes_", "")
+                collection_id = feed_id.removeprefix("itunes_")
                 return await self._get_itunes_episodes(collection_id, limit)
             
             # Handle PodcastIndex podcasts
@@ -134,7 +139,8 @@ class PodcastService:
             feed_response = await self.client.get(
                 f"{self.BASE_URL}/podcasts/byfeedid",
                 params={"id": feed_id},
-                headers=self._get_auth_headers()
+                headers=self._get_auth_headers(),
+                timeout=self.TIMEOUT
             )
             
             if feed_response.status_code != 200:
@@ -147,7 +153,8 @@ class PodcastService:
             episodes_response = await self.client.get(
                 f"{self.BASE_URL}/episodes/byfeedid",
                 params={"id": feed_id, "max": limit},
-                headers=self._get_auth_headers()
+                headers=self._get_auth_headers(),
+                timeout=self.TIMEOUT
             )
             
             if episodes_response.status_code != 200:
@@ -208,7 +215,8 @@ class PodcastService:
             # Look up podcast to get feed URL
             lookup_response = await self.client.get(
                 "https://itunes.apple.com/lookup",
-                params={"id": collection_id, "entity": "podcast"}
+                params={"id": collection_id, "entity": "podcast"},
+                timeout=self.TIMEOUT
             )
             
             if lookup_response.status_code != 200:
@@ -320,7 +328,5 @@ class PodcastService:
             "source": "podcast"
         }
 
-    async def close(self):
-        await self.client.aclose()
 
 podcast_service = PodcastService()
@@ -7,8 +7,11 @@ import httpx
 import re
 from typing import Optional, Dict, List, Any, Tuple
 import logging
+from functools import lru_cache
 from random import randrange
 
+from app.http_client import PooledClientMixin
+
 logger = logging.getLogger(__name__)
 
 
@@ -16,7 +19,16 @@ def get_random_user_agent():
     return f"Mozilla/5.0 (Macintosh; Intel Mac OS X 10_{randrange(11, 15)}_{randrange(4, 9)}) AppleWebKit/{randrange(530, 537)}.{randrange(30, 37)} (KHTML, like Gecko) Chrome/{randrange(80, 105)}.0.{randrange(3000, 4500)}.{randrange(60, 125)} Safari/{randrange(530, 537)}.{randrange(30, 36)}"
 
 
-class SpotifyService:
+# Spotify IDs are 22-character base62 strings (no source prefix like "dz_" or "LINK:")
+_SPOTIFY_ID_RE = re.compile(r"[0-9A-Za-z]{22}")
+
+
+def is_spotify_id(track_id: str) -> bool:
+    """Check whether an ID can be sent to Spotify's API as-is."""
+    return _SPOTIFY_ID_RE.fullmatch(track_id) is not None
+
+
+class SpotifyService(PooledClientMixin):
     """Service for fetching metadata from Spotify URLs (not for search)."""
     
     TOKEN_URL = "https://v1.nocodeapi.com/secondary-token/plRZ4pXNQ7frBzbmRRXutzegcux2/69a356fa351306bb60eef4c4?token=oiqiPLcENEGQsNPw&deleteToken=ysYdHgKIfLRMmrtp"
@@ -31,13 +43,16 @@ class SpotifyService:
         'artist': re.compile(r'(?:spotify\.com/artist/|spotify:artist:)([a-zA-Z0-9]+)'),
     }
     
-    def __init__(self):
+    def __init__(self, client: Optional[httpx.AsyncClient] = None, owns_client: bool = False):
         import os
         self.access_token: Optional[str] = None
         self.client_id = os.environ.get("SPOTIFY_CLIENT_ID")
         self.client_secret = os.environ.get("SPOTIFY_CLIENT_SECRET")
         self.sp_dc = os.environ.get("SPOTIFY_SP_DC")
-        self.client = httpx.AsyncClient(timeout=30.0)
+        # Shared pool (30s default timeout, same as the old dedicated client)
+        self._bind_client(client, owns_client)
+        # Users paste the same links repeatedly; memoize check + parse per query
+        self.classify_url = lru_cache(maxsize=2048)(self._classify_url)
     
     async def _get_access_token(self) -> str:
         """Get access token (Client Creds > Cookie > Web Player > Embed)."""
@@ -163,6 +178,12 @@ class SpotifyService:
         """Check if a URL is a Spotify URL."""
         return 'spotify.com/' in url or 'spotify:' in url
     
+    def _classify_url(self, q: str) -> Tuple[bool, Optional[Tuple[str, str]]]:
+        """Return (is_spotify_url, (type, id) or None) for a search query. Use the memoized classify_url."""
+        if not self.is_spotify_url(q):
+            return False, None
+        return True, self.parse_spotify_url(q)
+    
     # ========== TRACK METHODS ==========
     
     async def get_track_by_id(self, track_id: str) -> Optional[Dict[str, Any]]:
@@ -377,12 +398,12 @@ class SpotifyService:
     async def get_audio_features(self, track_id: str, isrc: str = None, name: str = None, artist: str = None) -> Optional[Dict[str, Any]]:
         """Get audio features (BPM, key, energy) for a single track.
         
-        If track_id starts with 'dz_' (Deezer), will try ISRC or name/artist lookup first.
+        If track_id is not a Spotify ID (Deezer, Dab, Jamendo, ...), will try ISRC or name/artist lookup first.
         """
         spotify_id = track_id
         
-        # Handle Deezer tracks - need to find Spotify equivalent
-        if track_id.startswith("dz_"):
+        # Handle other sources' tracks - need to find Spotify equivalent
+        if not is_spotify_id(track_id):
             spotify_id = None
             # Try ISRC first
             if isrc:
@@ -392,7 +413,7 @@ class SpotifyService:
                 spotify_id = await self.search_track_by_name(name, artist)
             
             if not spotify_id:
-                logger.warning(f"Could not find Spotify ID for Deezer track {track_id}")
+                logger.warning(f"Could not find Spotify ID for track {track_id}")
                 return None
         
         try:
@@ -515,8 +536,6 @@ class SpotifyService:
             logger.error(f"Error fetching Made For You playlists: {e}")
             return []
 
-    async def close(self):
-        await self.client.aclose()
 
 
 # Singleton instance
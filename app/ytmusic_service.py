@@ -43,7 +43,7 @@ class YTMusicService:
         """Get album details with tracks."""
         try:
             # Remove ytm_ prefix if present
-            clean_id = album_id.replace("ytm_", "")
+            clean_id = album_id.removeprefix("ytm_")
             data = self.ytm.get_album(clean_id)
             
             album = {